@@ -11,7 +11,7 @@ from typing import Any
 import deepmerge
 from assistant_extensions.attachments import AttachmentsExtension
 from assistant_extensions.document_editor import DocumentEditorConfigModel, DocumentEditorExtension
-from assistant_extensions.mcp import MCPServerConfig
+from assistant_extensions.mcp import MCPServerConfig, MCPSessionPool, close_shared_http_client
 from content_safety.evaluators import CombinedContentSafetyEvaluator
 from semantic_workbench_api_model.workbench_model import (
     ConversationEvent,
@@ -29,7 +29,7 @@ from semantic_workbench_assistant.assistant_app import (
 )
 
 from .config import AssistantConfigModel, ContextTransferConfigModel, DocumentAssistantConfigModel
-from .response import respond_to_conversation
+from .response import respond_to_conversation, warm_mcp_sessions
 from .whiteboard import WhiteboardInspector
 
 logger = logging.getLogger(__name__)
@@ -109,6 +109,16 @@ _ = WhiteboardInspector(state_id="whiteboard", app=assistant, server_config_prov
 
 attachments_extension = AttachmentsExtension(assistant)
 
+# keep MCP server sessions open across turns, per conversation
+mcp_session_pool = MCPSessionPool()
+
+
+@assistant.events.on_service_shutdown
+async def on_service_shutdown() -> None:
+    await mcp_session_pool.aclose()
+    await close_shared_http_client()
+
+
 #
 # create the FastAPI app instance
 #
@@ -170,6 +180,7 @@ async def on_message_created(
                 document_editor_extension=document_editor_extension,
                 context=context,
                 config=config,
+                mcp_session_pool=mcp_session_pool,
                 metadata=metadata,
             )
         except Exception as e:
@@ -243,21 +254,38 @@ async def on_conversation_created(context: ConversationContext) -> None:
     Handle the event triggered when the assistant is added to a conversation.
     """
 
+    config = await assistant_config.get(context.assistant)
+
     assistant_sent_messages = await context.get_messages(participant_ids=[context.assistant.id], limit=1)
     welcome_sent_before = len(assistant_sent_messages.messages) > 0
-    if welcome_sent_before:
-        return
-
-    # send a welcome message to the conversation
-    config = await assistant_config.get(context.assistant)
-    welcome_message = config.response_behavior.welcome_message
-    await context.send_messages(
-        NewConversationMessage(
-            content=welcome_message,
-            message_type=MessageType.chat,
-            metadata={"generated_content": False},
+    if not welcome_sent_before:
+        # send a welcome message to the conversation
+        welcome_message = config.response_behavior.welcome_message
+        await context.send_messages(
+            NewConversationMessage(
+                content=welcome_message,
+                message_type=MessageType.chat,
+                metadata={"generated_content": False},
+            )
         )
+
+    # connect to the MCP servers now, rather than on the first response
+    await warm_mcp_sessions(
+        document_editor_extension=document_editor_extension,
+        context=context,
+        config=config,
+        mcp_session_pool=mcp_session_pool,
     )
 
 
+@assistant.events.conversation.on_deleted
+async def on_conversation_deleted(context: ConversationContext) -> None:
+    """
+    Handle the event triggered when the assistant is removed from a conversation, or the conversation is deleted.
+    """
+
+    # close the conversation's MCP sessions, rather than leaving them to be evicted when idle
+    await mcp_session_pool.release(context.id)
+
+
 # endregion
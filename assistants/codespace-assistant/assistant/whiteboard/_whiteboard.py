@@ -6,6 +6,7 @@ from assistant_extensions.mcp import (
     ExtendedCallToolRequestParams,
     MCPClientSettings,
     MCPServerConfig,
+    MCPServerConnectionError,
     MCPSession,
     establish_mcp_sessions,
     handle_mcp_tool_call,
@@ -62,4 +63,7 @@ async def whiteboard_mcp_session(
             ],
             stack=stack,
         )
+        if not mcp_sessions:
+            # the server is skipped when it times out connecting
+            raise MCPServerConnectionError(server_config, TimeoutError("timed out connecting to MCP server"))
         yield mcp_sessions[0]
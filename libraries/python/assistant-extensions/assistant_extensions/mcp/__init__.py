@@ -1,6 +1,8 @@
 from ._assistant_file_resource_handler import AssistantFileResourceHandler
 from ._client_utils import (
+    INPROC_PREFIX,
     MCPServerConnectionError,
+    close_shared_http_client,
     establish_mcp_sessions,
     get_enabled_mcp_server_configs,
     get_mcp_server_prompts,
@@ -23,10 +25,12 @@ from ._openai_utils import (
     OpenAISamplingHandler,
     sampling_message_to_chat_completion_message,
 )
+from ._session_pool import MCPSessionPool
 from ._tool_utils import handle_mcp_tool_call, retrieve_mcp_tools_from_sessions
 from ._workbench_file_resource_handler import WorkbenchFileClientResourceHandler
 
 __all__ = [
+    "INPROC_PREFIX",
     "ExtendedCallToolRequestParams",
     "ExtendedCallToolResult",
     "MCPErrorHandler",
@@ -36,10 +40,12 @@ __all__ = [
     "HostedMCPServerConfig",
     "list_roots_callback_for",
     "MCPSession",
+    "MCPSessionPool",
     "MCPClientRoot",
     "MCPServerConnectionError",
     "MCPServerEnvConfig",
     "OpenAISamplingHandler",
+    "close_shared_http_client",
     "establish_mcp_sessions",
     "get_mcp_server_prompts",
     "get_enabled_mcp_server_configs",
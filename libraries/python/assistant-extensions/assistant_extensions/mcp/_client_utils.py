@@ -1,16 +1,26 @@
+import asyncio
+import importlib
 import logging
+import os
 import pathlib
 from asyncio import CancelledError
 from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import replace
+from itertools import chain
 from typing import Any, AsyncIterator
 from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
 
+import anyio
+import httpx
 import pydantic
 from mcp import ClientSession, McpError, types
-from mcp.client.sse import sse_client
-from mcp.client.stdio import StdioServerParameters, stdio_client
+from mcp.client.stdio import StdioServerParameters
+from mcp.server import Server
+from mcp.server.fastmcp import FastMCP
 from mcp.shared.context import RequestContext
-from mcp_extensions import ExtendedClientSession
+from mcp.shared.memory import create_client_server_memory_streams
+from mcp.shared.session import RequestResponder
+from mcp_extensions import ExtendedClientSession, buffered_stdio_client, shared_http_client_sse_client
 from semantic_workbench_assistant.assistant_app import ConversationContext
 
 from . import _devtunnel
@@ -22,6 +32,33 @@ from ._model import (
 
 logger = logging.getLogger(__name__)
 
+# HTTP client shared by all SSE connections, so that connections to servers are kept alive between sessions
+_shared_http_client: httpx.AsyncClient | None = None
+_shared_http_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _get_shared_http_client() -> httpx.AsyncClient:
+    global _shared_http_client, _shared_http_client_loop
+
+    # an http client is bound to the event loop it is used on
+    loop = asyncio.get_running_loop()
+    if _shared_http_client is None or _shared_http_client.is_closed or _shared_http_client_loop is not loop:
+        _shared_http_client = httpx.AsyncClient(limits=httpx.Limits(keepalive_expiry=60))
+        _shared_http_client_loop = loop
+
+    return _shared_http_client
+
+
+async def close_shared_http_client() -> None:
+    """Close the HTTP client shared by all SSE connections to MCP servers."""
+    global _shared_http_client, _shared_http_client_loop
+
+    http_client = _shared_http_client
+    _shared_http_client = None
+    _shared_http_client_loop = None
+    if http_client is not None:
+        await http_client.aclose()
+
 
 def get_env_dict(server_config: MCPServerConfig) -> dict[str, str] | None:
     """Get the environment variables as a dictionary."""
@@ -31,16 +68,61 @@ def get_env_dict(server_config: MCPServerConfig) -> dict[str, str] | None:
     return env_dict
 
 
+def get_stdio_env_dict(server_config: MCPServerConfig) -> dict[str, str] | None:
+    """
+    Get the environment to spawn a stdio server with, in addition to the mcp library's minimal default environment:
+    the variables named in env_passthrough, taken from this process's environment, and those set in env.
+
+    The passthrough variables are only for servers spawned as local processes; they must never be sent to a remote
+    server, so this is not used for the SSE transport, which sends the env as request headers.
+    """
+    env_dict = {key: os.environ[key] for key in server_config.env_passthrough if key in os.environ}
+    env_dict.update({env.key: env.value for env in server_config.env})
+    if len(env_dict) == 0:
+        return None
+    return env_dict
+
+
+# errors that are expected when a server cannot be reached, fails to start or rejects the connection
+_EXPECTED_CONNECTION_ERRORS = (OSError, TimeoutError, McpError, httpx.HTTPError)
+
+
+def _log_connection_error(server_config: MCPServerConfig, error: Exception) -> None:
+    """
+    Log an error connecting to a server, with a traceback only for unexpected errors.
+    """
+
+    # unwrap the exception groups raised by the transports' task groups
+    cause = error
+    while isinstance(cause, ExceptionGroup) and len(cause.exceptions) == 1:
+        cause = cause.exceptions[0]
+
+    if isinstance(cause, _EXPECTED_CONNECTION_ERRORS):
+        logger.warning("Error connecting to %s: %s: %s", server_config.key, type(cause).__name__, cause)
+        return
+
+    if isinstance(cause, ExceptionGroup):
+        for sub in cause.exceptions:
+            logger.error("Sub-exception: %s: %s", server_config.key, sub)
+
+    logger.error("Error connecting to %s: %s", server_config.key, cause, exc_info=error)
+
+
 @asynccontextmanager
 async def connect_to_mcp_server(client_settings: MCPClientSettings) -> AsyncIterator[ExtendedClientSession]:
     """Connect to a single MCP server defined in the config."""
-    transport = "sse" if client_settings.server_config.command.startswith("http") else "stdio"
+    command = client_settings.server_config.command
+    transport = "sse" if command.startswith("http") else "inproc" if command.startswith(INPROC_PREFIX) else "stdio"
 
     match transport:
         case "sse":
             async with connect_to_mcp_server_sse(client_settings) as client_session:
                 yield client_session
 
+        case "inproc":
+            async with connect_to_mcp_server_inproc(client_settings) as client_session:
+                yield client_session
+
         case "stdio":
             async with connect_to_mcp_server_stdio(client_settings) as client_session:
                 yield client_session
@@ -96,13 +178,17 @@ async def connect_to_mcp_server_stdio(client_settings: MCPClientSettings) -> Asy
     server_params = StdioServerParameters(
         command=client_settings.server_config.command,
         args=client_settings.server_config.args,
-        env=get_env_dict(client_settings.server_config),
-    )
-    logger.debug(
-        f"Attempting to connect to {client_settings.server_config.key} with command: {client_settings.server_config.command} {' '.join(client_settings.server_config.args)}"
+        env=get_stdio_env_dict(client_settings.server_config),
     )
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Attempting to connect to %s with command: %s %s",
+            client_settings.server_config.key,
+            client_settings.server_config.command,
+            " ".join(client_settings.server_config.args),
+        )
     try:
-        async with stdio_client(server_params) as (read_stream, write_stream):
+        async with buffered_stdio_client(server_params) as (read_stream, write_stream):
             async with ExtendedClientSession(
                 read_stream,
                 write_stream,
@@ -112,11 +198,77 @@ async def connect_to_mcp_server_stdio(client_settings: MCPClientSettings) -> Asy
                 logging_callback=client_settings.logging_callback,
                 experimental_resource_callbacks=client_settings.experimental_resource_callbacks,
             ) as client_session:
-                await client_session.initialize()
+                await asyncio.wait_for(
+                    client_session.initialize(), timeout=client_settings.server_config.connect_timeout
+                )
                 yield client_session  # Yield the session for use
 
     except Exception as e:
-        logger.exception(f"Error connecting to {client_settings.server_config.key}: {e}")
+        _log_connection_error(client_settings.server_config, e)
+        raise
+
+
+# command prefix for servers that are loaded into this process, rather than run as a subprocess
+INPROC_PREFIX = "inproc:"
+
+
+def _load_inproc_server(command: str) -> Server:
+    """
+    Load an MCP server from a command of the form "inproc:module[:factory]".
+
+    The factory defaults to "create_mcp_server", the convention used by the MCP servers in this repo, and may
+    return either a FastMCP server or a low-level Server.
+    """
+    module_name, _, factory_name = command.removeprefix(INPROC_PREFIX).partition(":")
+    module = importlib.import_module(module_name)
+    server = getattr(module, factory_name or "create_mcp_server")()
+    if isinstance(server, FastMCP):
+        return server._mcp_server
+    return server
+
+
+@asynccontextmanager
+async def connect_to_mcp_server_inproc(client_settings: MCPClientSettings) -> AsyncIterator[ExtendedClientSession]:
+    """
+    Connect to an MCP server that runs in this process, over in-memory streams.
+
+    This avoids the subprocess and the JSON-RPC serialization over pipes of a stdio server. Args and env
+    from the server config are not applied, as the server shares this process and its environment.
+    """
+
+    logger.debug(
+        "Attempting to connect to %s in process: %s",
+        client_settings.server_config.key,
+        client_settings.server_config.command,
+    )
+    try:
+        server = _load_inproc_server(client_settings.server_config.command)
+
+        async with create_client_server_memory_streams() as (client_streams, server_streams):
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(
+                    lambda: server.run(server_streams[0], server_streams[1], server.create_initialization_options())
+                )
+
+                try:
+                    async with ExtendedClientSession(
+                        client_streams[0],
+                        client_streams[1],
+                        list_roots_callback=client_settings.list_roots_callback,
+                        sampling_callback=client_settings.sampling_callback,
+                        message_handler=client_settings.message_handler,
+                        logging_callback=client_settings.logging_callback,
+                        experimental_resource_callbacks=client_settings.experimental_resource_callbacks,
+                    ) as client_session:
+                        await asyncio.wait_for(
+                            client_session.initialize(), timeout=client_settings.server_config.connect_timeout
+                        )
+                        yield client_session  # Yield the session for use
+                finally:
+                    tg.cancel_scope.cancel()
+
+    except Exception as e:
+        _log_connection_error(client_settings.server_config, e)
         raise
 
 
@@ -146,13 +298,16 @@ async def connect_to_mcp_server_sse(client_settings: MCPClientSettings) -> Async
         if devtunnel_config:
             url = await _devtunnel.forwarded_url_for(original_url=url, devtunnel=devtunnel_config)
 
-        logger.debug(f"Attempting to connect to {client_settings.server_config.key} with SSE transport: {url}")
+        logger.debug("Attempting to connect to %s with SSE transport: %s", client_settings.server_config.key, url)
 
         # FIXME: Bumping sse_read_timeout to 15 minutes and timeout to 5 minutes, but this should be configurable
-        async with sse_client(url=url, headers=headers, timeout=60 * 5, sse_read_timeout=60 * 15) as (
-            read_stream,
-            write_stream,
-        ):
+        async with shared_http_client_sse_client(
+            http_client=_get_shared_http_client(),
+            url=url,
+            headers=headers,
+            timeout=60 * 5,
+            sse_read_timeout=60 * 15,
+        ) as (read_stream, write_stream):
             async with ExtendedClientSession(
                 read_stream,
                 write_stream,
@@ -161,26 +316,20 @@ async def connect_to_mcp_server_sse(client_settings: MCPClientSettings) -> Async
                 message_handler=client_settings.message_handler,
                 experimental_resource_callbacks=client_settings.experimental_resource_callbacks,
             ) as client_session:
-                await client_session.initialize()
+                await asyncio.wait_for(
+                    client_session.initialize(), timeout=client_settings.server_config.connect_timeout
+                )
                 yield client_session  # Yield the session for use
 
     except ExceptionGroup as e:
-        logger.exception(f"TaskGroup failed in SSE client for {client_settings.server_config.key}: {e}")
-        for sub in e.exceptions:
-            logger.error(f"Sub-exception: {client_settings.server_config.key}: {sub}")
+        _log_connection_error(client_settings.server_config, e)
         # If there's exactly one underlying exception, re-raise it
         if len(e.exceptions) == 1:
             raise e.exceptions[0]
         else:
             raise
-    except CancelledError as e:
-        logger.exception(f"Task was cancelled in SSE client for {client_settings.server_config.key}: {e}")
-        raise
-    except RuntimeError as e:
-        logger.exception(f"Runtime error in SSE client for {client_settings.server_config.key}: {e}")
-        raise
     except Exception as e:
-        logger.exception(f"Error connecting to {client_settings.server_config.key}: {e}")
+        _log_connection_error(client_settings.server_config, e)
         raise
 
 
@@ -194,12 +343,12 @@ async def refresh_mcp_sessions(
     active_sessions = []
     for session in mcp_sessions:
         if not session.is_connected:
-            logger.info(f"Session {session.config.server_config.key} is disconnected. Attempting to reconnect...")
+            logger.info("Session %s is disconnected. Attempting to reconnect...", session.config.server_config.key)
             new_session = await reconnect_mcp_session(session.config)
             if new_session:
                 active_sessions.append(new_session)
             else:
-                logger.error(f"Failed to reconnect MCP server {session.config.server_config.key}.")
+                logger.error("Failed to reconnect MCP server %s.", session.config.server_config.key)
         else:
             active_sessions.append(session)
     return active_sessions
@@ -220,7 +369,6 @@ async def reconnect_mcp_session(client_settings: MCPClientSettings) -> MCPSessio
 
             new_session = MCPSession(config=client_settings, client_session=client_session)
             await new_session.initialize()
-            new_session.is_connected = True
             logger.info("Successfully reconnected to MCP server %s", client_settings.server_config.key)
             return new_session
     except Exception:
@@ -237,31 +385,137 @@ class MCPServerConnectionError(Exception):
         self.error = error
 
 
+async def _enter_mcp_session(client_config: MCPClientSettings, stack: AsyncExitStack) -> MCPSession:
+    """
+    Connect to and initialize a single MCP server, keeping the connection open until the stack is closed.
+
+    The connection context is entered and exited from a dedicated task, as the underlying anyio task groups
+    must be exited from the same task that entered them. This allows multiple servers to be connected
+    concurrently while still tying their lifetime to the caller's stack.
+    """
+
+    ready: asyncio.Future[MCPSession] = asyncio.get_running_loop().create_future()
+    close_requested = asyncio.Event()
+
+    mcp_session: MCPSession | None = None
+    message_handler = client_config.message_handler
+
+    async def handle_message(
+        message: RequestResponder[types.ServerRequest, types.ClientResult] | types.ServerNotification | Exception,
+    ) -> None:
+        if (
+            mcp_session is not None
+            and isinstance(message, types.ServerNotification)
+            and isinstance(message.root, types.ToolListChangedNotification)
+        ):
+            mcp_session.mark_tools_stale()
+        if message_handler is not None:
+            await message_handler(message)
+
+    async def hold_connection() -> None:
+        nonlocal mcp_session
+        try:
+            async with connect_to_mcp_server(replace(client_config, message_handler=handle_message)) as client_session:
+                mcp_session = MCPSession(config=client_config, client_session=client_session)
+                await asyncio.wait_for(mcp_session.initialize(), timeout=client_config.server_config.connect_timeout)
+                ready.set_result(mcp_session)
+                await close_requested.wait()
+        except BaseException as e:
+            if not ready.done():
+                # unwrap the exception groups raised by the transports' task groups
+                while isinstance(e, BaseExceptionGroup) and len(e.exceptions) == 1:
+                    e = e.exceptions[0]
+                ready.set_exception(e)
+                return
+            if isinstance(e, CancelledError):
+                raise
+            logger.exception("error closing MCP server connection: %s", client_config.server_config.key)
+
+    connection_task = asyncio.create_task(hold_connection())
+
+    async def close_connection() -> None:
+        close_requested.set()
+        await connection_task
+
+    stack.push_async_callback(close_connection)
+    return await ready
+
+
+def _connection_key(server_config: MCPServerConfig) -> tuple:
+    """
+    Get the parts of a server config that identify a connection; configs with equal keys can share a connection.
+    """
+    return (
+        server_config.command,
+        tuple(server_config.args),
+        tuple((env.key, env.value) for env in server_config.env),
+        tuple(server_config.env_passthrough),
+        tuple((root.name, root.uri) for root in server_config.roots),
+    )
+
+
 async def establish_mcp_sessions(
     client_settings: list[MCPClientSettings],
     stack: AsyncExitStack,
 ) -> list[MCPSession]:
     """
     Establish connections to multiple MCP servers and return their sessions.
+
+    Servers are connected concurrently, so the total time is bounded by the slowest server rather than
+    the sum of all servers. Server configs with the same command, args, env and roots share a single
+    connection, so such servers must not hold per-caller state.
     """
 
-    mcp_sessions: list[MCPSession] = []
+    enabled_client_settings: list[MCPClientSettings] = []
+    to_connect: dict[tuple, MCPClientSettings] = {}
     for client_config in client_settings:
         if not client_config.server_config.enabled:
             logger.debug("skipping disabled MCP server: %s", client_config.server_config.key)
             continue
+        enabled_client_settings.append(client_config)
+        to_connect.setdefault(_connection_key(client_config.server_config), client_config)
 
-        try:
-            client_session: ExtendedClientSession = await stack.enter_async_context(
-                connect_to_mcp_server(client_config)
+    if not to_connect:
+        return []
+
+    results = await asyncio.gather(
+        *(_enter_mcp_session(client_config, stack) for client_config in to_connect.values()),
+        return_exceptions=True,
+    )
+
+    connected: dict[tuple, MCPSession] = {}
+    for (connection_key, client_config), result in zip(to_connect.items(), results):
+        if isinstance(result, CancelledError):
+            raise result
+
+        if isinstance(result, TimeoutError):
+            # a server that is slow to initialize is skipped, so that it does not hold up the others
+            logger.warning("timed out connecting to MCP server; skipping: %s", client_config.server_config.key)
+            continue
+
+        if isinstance(result, BaseException):
+            # the connect path has already logged the details (and any traceback) for this server
+            logger.error("failed to connect to MCP server: %s: %s", client_config.server_config.key, result)
+            if not isinstance(result, Exception):
+                raise result
+            raise MCPServerConnectionError(client_config.server_config, result) from result
+
+        connected[connection_key] = result
+
+    mcp_sessions: list[MCPSession] = []
+    for client_config in enabled_client_settings:
+        mcp_session = connected.get(_connection_key(client_config.server_config))
+        if mcp_session is None:
+            continue
+
+        if mcp_session.config is not client_config:
+            logger.debug(
+                "sharing MCP server connection of %s with %s",
+                mcp_session.config.server_config.key,
+                client_config.server_config.key,
             )
-        except Exception as e:
-            # Log a cleaner error message for this specific server
-            logger.exception("failed to connect to MCP server: %s", client_config.server_config.key)
-            raise MCPServerConnectionError(client_config.server_config, e) from e
+            mcp_session = mcp_session.shared_with(client_config)
 
-        mcp_session = MCPSession(config=client_config, client_session=client_session)
-        await mcp_session.initialize()
         mcp_sessions.append(mcp_session)
 
     return mcp_sessions
@@ -271,25 +525,46 @@ def get_enabled_mcp_server_configs(mcp_servers: list[MCPServerConfig]) -> list[M
     return [server_config for server_config in mcp_servers if server_config.enabled]
 
 
+async def _get_auto_include_prompt_texts(session: MCPSession, prompt_name: str) -> list[str]:
+    """Get the text of the messages of a prompt provided by an MCP server."""
+    try:
+        prompt_result = await session.client_session.get_prompt(prompt_name)
+    except McpError:
+        logger.exception(
+            "Failed to retrieve prompt '%s' from MCP server %s", prompt_name, session.config.server_config.key
+        )
+        return []
+
+    texts: list[str] = []
+    for message in prompt_result.messages:
+        if isinstance(message.content, types.TextContent):
+            texts.append(message.content.text)
+            continue
+
+        logger.warning("Unexpected message content type in memory prompt '%s': %s", prompt_name, type(message.content))
+    return texts
+
+
 async def get_mcp_server_prompts(mcp_sessions: list[MCPSession]) -> list[str]:
-    """Get the prompts for all MCP servers that have them."""
-    prompts = [session.config.server_config.prompt for session in mcp_sessions if session.config.server_config.prompt]
+    """
+    Get the prompts for all MCP servers that have them.
 
-    for session in mcp_sessions:
-        for prompt_name in session.config.server_config.prompts_to_auto_include:
-            try:
-                prompt_result = await session.client_session.get_prompt(prompt_name)
-                for message in prompt_result.messages:
-                    if isinstance(message.content, types.TextContent):
-                        prompts.append(message.content.text)
-                        continue
-
-                    logger.warning(
-                        f"Unexpected message content type in memory prompt '{prompt_name}': {type(message.content)}"
-                    )
-            except McpError:
-                logger.exception(
-                    "Failed to retrieve prompt '%s' from MCP server %s", prompt_name, session.config.server_config.key
-                )
+    A list is returned, rather than an iterator, as the prompts are reused for every step of a response.
+    """
 
-    return prompts
+    # the auto-included prompts can change from turn to turn, so they are fetched each time, but concurrently
+    auto_include_prompt_texts = await asyncio.gather(
+        *(
+            _get_auto_include_prompt_texts(session, prompt_name)
+            for session in mcp_sessions
+            for prompt_name in session.config.server_config.prompts_to_auto_include
+        )
+    )
+
+    # assemble the server prompts and auto-included prompt texts into the result in a single pass
+    return list(
+        chain(
+            (session.config.server_config.prompt for session in mcp_sessions if session.config.server_config.prompt),
+            chain.from_iterable(auto_include_prompt_texts),
+        )
+    )
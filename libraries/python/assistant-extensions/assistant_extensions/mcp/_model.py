@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import os
 from dataclasses import dataclass
@@ -7,6 +8,9 @@ from mcp.client.session import ListRootsFnT, LoggingFnT, MessageHandlerFnT, Samp
 from mcp.types import (
     CallToolRequestParams,
     CallToolResult,
+    Prompt,
+    Resource,
+    Tool,
 )
 from mcp_extensions import ExtendedClientSession, ListResourcesFnT, ReadResourceFnT, WriteResourceFnT
 from pydantic import BaseModel, Field
@@ -38,7 +42,10 @@ class MCPServerConfig(BaseModel):
         str,
         Field(
             title="Command",
-            description="Command to run the server, use url if using SSE transport.",
+            description=(
+                "Command to run the server, use url if using SSE transport, or 'inproc:<module>' to load a"
+                " Python MCP server into the assistant's process."
+            ),
         ),
     ]
 
@@ -60,6 +67,18 @@ class MCPServerConfig(BaseModel):
         Field(title="Environment Variables", description="Environment variables to set."),
     ] = []
 
+    env_passthrough: Annotated[
+        list[str],
+        Field(
+            title="Environment Variables to Pass Through",
+            description=(
+                "Names of environment variables to pass from the assistant to a server run as a local process"
+                " (stdio). Other than these, the server only receives a minimal default environment (such as PATH"
+                " and HOME). Ignored for servers connected by URL, so the values are never sent to them."
+            ),
+        ),
+    ] = []
+
     prompt: Annotated[
         str,
         Field(title="Prompt", description="Instructions for using the server."),
@@ -87,6 +106,14 @@ class MCPServerConfig(BaseModel):
         ),
     ] = 30
 
+    connect_timeout: Annotated[
+        float,
+        Field(
+            title="Connect Timeout",
+            description="Time to wait for the server to initialize (in seconds), before skipping it.",
+        ),
+    ] = 60
+
 
 class HostedMCPServerConfig(MCPServerConfig):
     """
@@ -129,6 +156,19 @@ class HostedMCPServerConfig(MCPServerConfig):
         UISchema(readonly=True, widget="hidden"),
     ] = []
 
+    env_passthrough: Annotated[
+        list[str],
+        Field(
+            title="Environment Variables to Pass Through",
+            description=(
+                "Names of environment variables to pass from the assistant to a server run as a local process"
+                " (stdio). Other than these, the server only receives a minimal default environment (such as PATH"
+                " and HOME). Ignored for servers connected by URL, so the values are never sent to them."
+            ),
+        ),
+        UISchema(readonly=True, widget="hidden"),
+    ] = []
+
     prompt: Annotated[
         str,
         Field(title="Prompt", description="Instructions for using the server."),
@@ -159,6 +199,15 @@ class HostedMCPServerConfig(MCPServerConfig):
         UISchema(readonly=True, widget="hidden"),
     ] = 30
 
+    connect_timeout: Annotated[
+        float,
+        Field(
+            title="Connect Timeout",
+            description="Time to wait for the server to initialize (in seconds), before skipping it.",
+        ),
+        UISchema(readonly=True, widget="hidden"),
+    ] = 60
+
     @staticmethod
     def from_env(
         key: str,
@@ -190,19 +239,90 @@ class MCPClientSettings:
 class MCPSession:
     config: MCPClientSettings
     client_session: ExtendedClientSession
-    # tools: List[Tool] = []
+    prompts: list[Prompt]
+    resources: list[Resource]
     is_connected: bool = True
 
     def __init__(self, config: MCPClientSettings, client_session: ExtendedClientSession) -> None:
         self.config = config
         self.client_session = client_session
+        self.tools = []
+        self.prompts = []
+        self.resources = []
+        # set when the server notifies that its tools have changed, so they are re-fetched on next use
+        self._tools_stale = False
+        self._tools_lock = asyncio.Lock()
+        # the session whose connection (and tools) this session shares, if any
+        self._shared_from: MCPSession | None = None
+
+    @property
+    def tools(self) -> list[Tool]:
+        return self._tools
+
+    @tools.setter
+    def tools(self, tools: list[Tool]) -> None:
+        # index the tools by name once when they are loaded, rather than scanning them on every tool call
+        self._tools = tools
+        self._tools_by_name: dict[str, Tool] = {}
+        for tool in tools:
+            self._tools_by_name.setdefault(tool.name, tool)
+
+    def mark_tools_stale(self) -> None:
+        """
+        Mark the tools as changed on the server, so that the next call to list_tools fetches them again.
+        """
+        self._tools_stale = True
+
+    async def list_tools(self) -> list[Tool]:
+        """
+        Get the server's tools, fetching them from the server only when they have changed since they were
+        last fetched. Concurrent callers share a single fetch.
+        """
+        if self._shared_from is not None:
+            tools = await self._shared_from.list_tools()
+        else:
+            async with self._tools_lock:
+                if self._tools_stale:
+                    self._tools_stale = False
+                    try:
+                        tools = (await self.client_session.list_tools()).tools
+                    except BaseException:
+                        self._tools_stale = True
+                        raise
+                    logger.debug("Reloaded %d tools from session '%s'", len(tools), self.config.server_config.key)
+                else:
+                    tools = self._tools
+
+        if tools is not self._tools:
+            self.tools = tools
+        return self._tools
+
+    def get_tool(self, name: str) -> Tool | None:
+        """
+        Get the tool with the given name, or None if the server has no such tool.
+        """
+        return self._tools_by_name.get(name)
 
     async def initialize(self) -> None:
         # Load all tools from the session, later we can do the same for resources, prompts, etc.
         tools_result = await self.client_session.list_tools()
         self.tools = tools_result.tools
+
         self.is_connected = True
-        logger.debug(f"Loaded {len(tools_result.tools)} tools from session '{self.config.server_config.key}'")
+        logger.debug("Loaded %d tools from session '%s'", len(self.tools), self.config.server_config.key)
+
+    def shared_with(self, config: MCPClientSettings) -> "MCPSession":
+        """
+        Get a session for another server config that shares this session's connection, and its loaded
+        tools, prompts and resources.
+        """
+        session = MCPSession(config=config, client_session=self.client_session)
+        session.tools = self.tools
+        session.prompts = self.prompts
+        session.resources = self.resources
+        session.is_connected = self.is_connected
+        session._shared_from = self
+        return session
 
 
 class ExtendedCallToolRequestParams(CallToolRequestParams):
@@ -0,0 +1,218 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from contextlib import AsyncExitStack
+from dataclasses import dataclass
+
+from ._client_utils import MCPServerConnectionError, _connection_key, _enter_mcp_session
+from ._model import MCPClientSettings, MCPSession
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _PooledSession:
+    connection_key: tuple
+    session: MCPSession
+    stack: AsyncExitStack
+
+
+class MCPSessionPool:
+    """
+    Keeps MCP sessions open across requests, so that each server is started and initialized once and then reused.
+
+    Sessions are pooled per scope (for example, a conversation id) and server key. As the client settings hold
+    callbacks that are bound to the caller, the settings from the first acquisition are used for the lifetime
+    of a pooled session. A session is reconnected when its server config changes or it is found disconnected.
+
+    Once sessions have been acquired, a background task runs every maintenance_interval seconds. It releases the
+    scopes that have not been acquired within idle_timeout seconds, and pings the remaining sessions, reconnecting
+    those that fail to respond. Scopes should also be released as soon as they are no longer needed (for example,
+    when the conversation is deleted).
+    """
+
+    def __init__(
+        self,
+        ping_timeout: float = 10.0,
+        idle_timeout: float = 30 * 60.0,
+        maintenance_interval: float = 60.0,
+    ) -> None:
+        self._ping_timeout = ping_timeout
+        self._idle_timeout = idle_timeout
+        self._maintenance_interval = maintenance_interval
+        self._entries: dict[tuple[str, str], _PooledSession] = {}
+        self._scope_locks: defaultdict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._scope_last_acquired: dict[str, float] = {}
+        self._maintenance_task: asyncio.Task[None] | None = None
+
+    async def acquire(self, client_settings: list[MCPClientSettings], scope: str = "") -> list[MCPSession]:
+        """
+        Get sessions for the enabled servers in the client settings, connecting only those that are not
+        already pooled (or whose config has changed).
+        """
+
+        if not any(client_config.server_config.enabled for client_config in client_settings):
+            return []
+
+        self._start_maintenance()
+
+        async with self._scope_locks[scope]:
+            self._scope_last_acquired[scope] = time.monotonic()
+
+            enabled_client_settings: list[MCPClientSettings] = []
+            to_connect: list[MCPClientSettings] = []
+            for client_config in client_settings:
+                server_config = client_config.server_config
+                if not server_config.enabled:
+                    logger.debug("skipping disabled MCP server: %s", server_config.key)
+                    continue
+
+                enabled_client_settings.append(client_config)
+
+                entry = self._entries.get((scope, server_config.key))
+                if (
+                    entry is not None
+                    and entry.session.is_connected
+                    and entry.connection_key == _connection_key(server_config)
+                ):
+                    continue
+
+                if entry is not None:
+                    await self._close_entry(scope, server_config.key)
+                to_connect.append(client_config)
+
+            results = await asyncio.gather(
+                *(self._connect(scope, client_config) for client_config in to_connect),
+                return_exceptions=True,
+            )
+
+            for client_config, result in zip(to_connect, results):
+                if isinstance(result, asyncio.CancelledError):
+                    raise result
+
+                if isinstance(result, TimeoutError):
+                    # a server that is slow to initialize is skipped, so that it does not hold up the others
+                    logger.warning("timed out connecting to MCP server; skipping: %s", client_config.server_config.key)
+                    continue
+
+                if isinstance(result, BaseException):
+                    logger.error("failed to connect to MCP server: %s: %s", client_config.server_config.key, result)
+                    if not isinstance(result, Exception):
+                        raise result
+                    raise MCPServerConnectionError(client_config.server_config, result) from result
+
+            sessions = [
+                self._entries[(scope, client_config.server_config.key)].session
+                for client_config in enabled_client_settings
+                if (scope, client_config.server_config.key) in self._entries
+            ]
+
+            # re-fetch the tools of any servers that have notified that their tools changed
+            await asyncio.gather(*(session.list_tools() for session in sessions))
+            return sessions
+
+    async def health_check(self) -> None:
+        """
+        Ping each pooled session, reconnecting any that fail to respond.
+        """
+
+        for (scope, server_key), entry in list(self._entries.items()):
+            async with self._scope_locks[scope]:
+                if self._entries.get((scope, server_key)) is not entry:
+                    continue
+
+                try:
+                    await asyncio.wait_for(entry.session.client_session.send_ping(), timeout=self._ping_timeout)
+                    continue
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logger.warning("MCP server %s failed health check; reconnecting", server_key, exc_info=True)
+
+                await self._close_entry(scope, server_key)
+                try:
+                    await self._connect(scope, entry.session.config)
+                except Exception:
+                    logger.exception("failed to reconnect MCP server: %s", server_key)
+
+    async def evict_idle(self) -> None:
+        """
+        Release the scopes that have not been acquired within the idle timeout.
+        """
+
+        cutoff = time.monotonic() - self._idle_timeout
+        for scope, last_acquired in list(self._scope_last_acquired.items()):
+            if last_acquired > cutoff or self._scope_locks[scope].locked():
+                continue
+
+            logger.debug("releasing idle MCP sessions; scope: %s", scope)
+            await self.release(scope)
+
+    async def release(self, scope: str) -> None:
+        """
+        Close all of the pooled sessions for a scope.
+        """
+
+        async with self._scope_locks[scope]:
+            for entry_scope, server_key in list(self._entries.keys()):
+                if entry_scope == scope:
+                    await self._close_entry(entry_scope, server_key)
+
+        self._scope_locks.pop(scope, None)
+        self._scope_last_acquired.pop(scope, None)
+
+    async def aclose(self) -> None:
+        """
+        Stop the maintenance task and close all of the pooled sessions.
+        """
+
+        if self._maintenance_task is not None:
+            self._maintenance_task.cancel()
+            try:
+                await self._maintenance_task
+            except asyncio.CancelledError:
+                pass
+            self._maintenance_task = None
+
+        for scope in {scope for scope, _ in self._entries} | self._scope_last_acquired.keys():
+            await self.release(scope)
+
+    def _start_maintenance(self) -> None:
+        if self._maintenance_task is None or self._maintenance_task.done():
+            self._maintenance_task = asyncio.create_task(self._maintain(), name="mcp_session_pool_maintenance")
+
+    async def _maintain(self) -> None:
+        while True:
+            await asyncio.sleep(self._maintenance_interval)
+            try:
+                await self.evict_idle()
+                await self.health_check()
+            except Exception:
+                logger.exception("error maintaining MCP session pool")
+
+    async def _connect(self, scope: str, client_config: MCPClientSettings) -> MCPSession:
+        stack = AsyncExitStack()
+        try:
+            session = await _enter_mcp_session(client_config, stack)
+        except BaseException:
+            await stack.aclose()
+            raise
+
+        self._entries[(scope, client_config.server_config.key)] = _PooledSession(
+            connection_key=_connection_key(client_config.server_config),
+            session=session,
+            stack=stack,
+        )
+        return session
+
+    async def _close_entry(self, scope: str, server_key: str) -> None:
+        entry = self._entries.pop((scope, server_key), None)
+        if entry is None:
+            return
+
+        entry.session.is_connected = False
+        try:
+            await entry.stack.aclose()
+        except Exception:
+            logger.exception("error closing pooled MCP session: %s", server_key)
@@ -52,10 +52,11 @@ def get_mcp_session_and_tool_by_tool_name(
     """
     Retrieve the MCP session and tool by tool name.
     """
-    return next(
-        ((mcp_session, tool) for mcp_session in mcp_sessions for tool in mcp_session.tools if tool.name == tool_name),
-        (None, None),
-    )
+    for mcp_session in mcp_sessions:
+        tool = mcp_session.get_tool(tool_name)
+        if tool is not None:
+            return mcp_session, tool
+    return None, None
 
 
 async def handle_mcp_tool_call(
@@ -147,7 +148,10 @@ async def execute_tool(
         return await mcp_session.client_session.call_tool(tool_call.name, tool_call.arguments)
 
     logger.debug(
-        f"Invoking '{mcp_session.config.server_config.key}.{tool_call.name}' with arguments: {tool_call.arguments}"
+        "Invoking '%s.%s' with arguments: %s",
+        mcp_session.config.server_config.key,
+        tool_call.name,
+        tool_call.arguments,
     )
 
     try:
@@ -161,7 +165,7 @@ async def execute_tool(
         # Check if the error indicates a disconnection.
         if "peer closed connection" in error_message.lower():
             mcp_session.is_connected = False
-        logger.exception(f"Error executing tool '{tool_call.name}': {error_message}")
+        logger.exception("Error executing tool '%s': %s", tool_call.name, error_message)
         error_text = f"Tool '{tool_call.name}' failed with error: {error_message}"
         return ExtendedCallToolResult(
             id=tool_call.id,
@@ -0,0 +1,139 @@
+from contextlib import AsyncExitStack
+from typing import Any
+
+import pytest
+from assistant_extensions.mcp import MCPClientSettings, MCPServerConfig, MCPSessionPool, _session_pool
+
+
+class FakeClientSession:
+    def __init__(self) -> None:
+        self.ping_error: Exception | None = None
+
+    async def send_ping(self) -> None:
+        if self.ping_error is not None:
+            raise self.ping_error
+
+
+class FakeSession:
+    def __init__(self, config: MCPClientSettings) -> None:
+        self.config = config
+        self.client_session = FakeClientSession()
+        self.is_connected = True
+
+    async def list_tools(self) -> None:
+        pass
+
+
+@pytest.fixture
+def connections(monkeypatch: pytest.MonkeyPatch) -> dict[str, list[Any]]:
+    connections: dict[str, list[Any]] = {"opened": [], "closed": []}
+
+    async def enter_mcp_session(client_config: MCPClientSettings, stack: AsyncExitStack) -> FakeSession:
+        session = FakeSession(client_config)
+        connections["opened"].append(session)
+        stack.callback(connections["closed"].append, session)
+        return session
+
+    monkeypatch.setattr(_session_pool, "_enter_mcp_session", enter_mcp_session)
+    return connections
+
+
+def client_settings(command: str = "server", enabled: bool = True) -> list[MCPClientSettings]:
+    return [MCPClientSettings(server_config=MCPServerConfig(key="server", command=command, enabled=enabled))]
+
+
+async def test_acquire_reuses_sessions(connections: dict[str, list[Any]]) -> None:
+    pool = MCPSessionPool()
+    try:
+        first = await pool.acquire(client_settings(), scope="conversation-1")
+        second = await pool.acquire(client_settings(), scope="conversation-1")
+        other_scope = await pool.acquire(client_settings(), scope="conversation-2")
+
+        assert first == second
+        assert other_scope != first
+        assert len(connections["opened"]) == 2
+        assert connections["closed"] == []
+    finally:
+        await pool.aclose()
+
+    assert len(connections["closed"]) == 2
+
+
+async def test_acquire_skips_disabled_servers(connections: dict[str, list[Any]]) -> None:
+    pool = MCPSessionPool()
+    try:
+        assert await pool.acquire(client_settings(enabled=False), scope="conversation-1") == []
+        assert connections["opened"] == []
+    finally:
+        await pool.aclose()
+
+
+async def test_acquire_reconnects_on_config_change(connections: dict[str, list[Any]]) -> None:
+    pool = MCPSessionPool()
+    try:
+        [first] = await pool.acquire(client_settings(command="server"), scope="conversation-1")
+        [second] = await pool.acquire(client_settings(command="other-server"), scope="conversation-1")
+
+        assert second is not first
+        assert connections["closed"] == [first]
+    finally:
+        await pool.aclose()
+
+
+async def test_acquire_reconnects_disconnected_session(connections: dict[str, list[Any]]) -> None:
+    pool = MCPSessionPool()
+    try:
+        [first] = await pool.acquire(client_settings(), scope="conversation-1")
+        first.is_connected = False
+        [second] = await pool.acquire(client_settings(), scope="conversation-1")
+
+        assert second is not first
+        assert connections["closed"] == [first]
+    finally:
+        await pool.aclose()
+
+
+async def test_release_closes_scope_sessions(connections: dict[str, list[Any]]) -> None:
+    pool = MCPSessionPool()
+    try:
+        [released] = await pool.acquire(client_settings(), scope="conversation-1")
+        [kept] = await pool.acquire(client_settings(), scope="conversation-2")
+
+        await pool.release("conversation-1")
+
+        assert connections["closed"] == [released]
+        assert await pool.acquire(client_settings(), scope="conversation-2") == [kept]
+
+        [reconnected] = await pool.acquire(client_settings(), scope="conversation-1")
+        assert reconnected is not released
+    finally:
+        await pool.aclose()
+
+
+async def test_evict_idle_releases_idle_scopes(connections: dict[str, list[Any]]) -> None:
+    pool = MCPSessionPool(idle_timeout=0)
+    try:
+        [session] = await pool.acquire(client_settings(), scope="conversation-1")
+
+        await pool.evict_idle()
+
+        assert connections["closed"] == [session]
+    finally:
+        await pool.aclose()
+
+
+async def test_health_check_reconnects_unresponsive_sessions(connections: dict[str, list[Any]]) -> None:
+    pool = MCPSessionPool()
+    try:
+        await pool.acquire(client_settings(), scope="conversation-1")
+        [unresponsive] = connections["opened"]
+        unresponsive.client_session.ping_error = RuntimeError("no response")
+
+        await pool.health_check()
+
+        assert connections["closed"] == [unresponsive]
+        [reconnected] = await pool.acquire(client_settings(), scope="conversation-1")
+        assert reconnected is not unresponsive
+        assert len(connections["opened"]) == 2
+    finally:
+        await pool.aclose()
@@ -10,6 +10,8 @@ from ._client_session import (
 from ._model import ServerNotificationHandler, ToolCallFunction, ToolCallProgressMessage
 from ._sampling import send_sampling_request
 from ._server_extensions import list_client_resources, read_client_resource, write_client_resource
+from ._sse_client import shared_http_client_sse_client
+from ._stdio_client import buffered_stdio_client
 from ._tool_utils import (
     convert_tools_to_openai_tools,
     execute_tool_with_retries,
@@ -27,6 +29,8 @@ __all__ = [
     "write_client_resource",
     "send_sampling_request",
     "send_tool_call_progress",
+    "buffered_stdio_client",
+    "shared_http_client_sse_client",
     "ServerNotificationHandler",
     "ToolCallFunction",
     "ToolCallProgressMessage",
@@ -1,3 +1,4 @@
+import functools
 from datetime import timedelta
 from typing import Annotated, Any, Literal, Protocol
 
@@ -102,6 +103,46 @@ class ExtendedServerRequest(
     pass
 
 
+@functools.cache
+def _initialize_request(sampling: bool, roots: bool, experimental_resources: bool) -> types.ClientRequest:
+    """
+    Build the initialize request for a combination of client capabilities.
+
+    The request is the same for every session with the same capabilities, so it is built once and reused.
+    """
+    return types.ClientRequest(
+        types.InitializeRequest(
+            method="initialize",
+            params=types.InitializeRequestParams(
+                protocolVersion=types.LATEST_PROTOCOL_VERSION,
+                capabilities=types.ClientCapabilities(
+                    sampling=types.SamplingCapability() if sampling else None,
+                    experimental={"resources": {}} if experimental_resources else None,
+                    roots=(
+                        types.RootsCapability(
+                            # TODO: Should this be based on whether we
+                            # _will_ send notifications, or only whether
+                            # they're supported?
+                            listChanged=True,
+                        )
+                        if roots
+                        else None
+                    ),
+                ),
+                clientInfo=types.Implementation(name="mcp", version="0.1.0"),
+            ),
+        )
+    )
+
+
+_initialized_notification = types.ClientNotification(types.InitializedNotification(method="notifications/initialized"))
+
+# type adapters are expensive to build, so they are built once rather than per request
+_list_resources_response_adapter = TypeAdapter(types.ListResourcesResult | types.ErrorData)
+_read_resource_response_adapter = TypeAdapter(types.ReadResourceResult | types.ErrorData)
+_write_resource_response_adapter = TypeAdapter(WriteResourceResult | types.ErrorData)
+
+
 class ExtendedClientSession(ClientSession):
     def __init__(
         self,
@@ -134,33 +175,11 @@ class ExtendedClientSession(ClientSession):
         )
 
     async def initialize(self) -> types.InitializeResult:
-        sampling = types.SamplingCapability() if self._sampling_callback is not None else None
-        roots = (
-            types.RootsCapability(
-                # TODO: Should this be based on whether we
-                # _will_ send notifications, or only whether
-                # they're supported?
-                listChanged=True,
-            )
-            if self._list_roots_callback is not None
-            else None
-        )
-        experimental = {"resources": {}} if self._list_resources_callback is not None else None
-
         result = await self.send_request(
-            types.ClientRequest(
-                types.InitializeRequest(
-                    method="initialize",
-                    params=types.InitializeRequestParams(
-                        protocolVersion=types.LATEST_PROTOCOL_VERSION,
-                        capabilities=types.ClientCapabilities(
-                            sampling=sampling,
-                            experimental=experimental,
-                            roots=roots,
-                        ),
-                        clientInfo=types.Implementation(name="mcp", version="0.1.0"),
-                    ),
-                )
+            _initialize_request(
+                sampling=self._sampling_callback is not None,
+                roots=self._list_roots_callback is not None,
+                experimental_resources=self._list_resources_callback is not None,
             ),
             types.InitializeResult,
         )
@@ -168,9 +187,7 @@ class ExtendedClientSession(ClientSession):
         if result.protocolVersion not in SUPPORTED_PROTOCOL_VERSIONS:
             raise RuntimeError(f"Unsupported protocol version from the server: {result.protocolVersion}")
 
-        await self.send_notification(
-            types.ClientNotification(types.InitializedNotification(method="notifications/initialized"))
-        )
+        await self.send_notification(_initialized_notification)
 
         return result
 
@@ -187,19 +204,19 @@ class ExtendedClientSession(ClientSession):
             case types.ListResourcesRequest():
                 with responder:
                     response = await self._list_resources_callback(ctx)
-                    client_response = TypeAdapter(types.ListResourcesResult | types.ErrorData).validate_python(response)
+                    client_response = _list_resources_response_adapter.validate_python(response)
                     await responder.respond(client_response)
 
             case types.ReadResourceRequest(params=params):
                 with responder:
                     response = await self._read_resource_callback(ctx, params)
-                    client_response = TypeAdapter(types.ReadResourceResult | types.ErrorData).validate_python(response)
+                    client_response = _read_resource_response_adapter.validate_python(response)
                     await responder.respond(client_response)
 
             case WriteResourceRequest(params=params):
                 with responder:
                     response = await self._write_resource_callback(ctx, params)
-                    client_response = TypeAdapter(WriteResourceResult | types.ErrorData).validate_python(response)
+                    client_response = _write_resource_response_adapter.validate_python(response)
                     await responder.respond(client_response)
 
             # standard requests go to ClientSession
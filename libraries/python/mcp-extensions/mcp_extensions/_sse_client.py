@@ -0,0 +1,132 @@
+"""
+SSE client transport over a shared HTTP client.
+
+Adapted from mcp.client.sse.sse_client in mcp 1.6.0 (the version pinned in pyproject.toml).
+"""
+
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+from urllib.parse import urljoin, urlparse
+
+import anyio
+import httpx
+from anyio.abc import TaskStatus
+from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
+from httpx_sse import aconnect_sse
+from mcp import types
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def shared_http_client_sse_client(
+    http_client: httpx.AsyncClient,
+    url: str,
+    headers: dict[str, Any] | None = None,
+    timeout: float = 5,
+    sse_read_timeout: float = 60 * 5,
+) -> AsyncIterator[
+    tuple[
+        MemoryObjectReceiveStream[types.JSONRPCMessage | Exception],
+        MemoryObjectSendStream[types.JSONRPCMessage],
+    ]
+]:
+    """
+    Client transport for SSE, equivalent to mcp.client.sse.sse_client, using a caller-provided HTTP client.
+
+    Sharing an HTTP client across sessions lets its connection pool keep connections to a server alive
+    between sessions, rather than opening (and TLS handshaking) a new connection for every session. The
+    caller owns the HTTP client and is responsible for closing it.
+    """
+
+    read_stream: MemoryObjectReceiveStream[types.JSONRPCMessage | Exception]
+    read_stream_writer: MemoryObjectSendStream[types.JSONRPCMessage | Exception]
+
+    write_stream: MemoryObjectSendStream[types.JSONRPCMessage]
+    write_stream_reader: MemoryObjectReceiveStream[types.JSONRPCMessage]
+
+    read_stream_writer, read_stream = anyio.create_memory_object_stream(0)
+    write_stream, write_stream_reader = anyio.create_memory_object_stream(0)
+
+    post_headers = {**(headers or {}), "Content-Type": "application/json"}
+
+    async with anyio.create_task_group() as tg:
+        try:
+            logger.debug("connecting to SSE endpoint: %s", urljoin(url, urlparse(url).path))
+            async with aconnect_sse(
+                http_client,
+                "GET",
+                url,
+                headers=dict(headers or {}),
+                timeout=httpx.Timeout(timeout, read=sse_read_timeout),
+            ) as event_source:
+                event_source.response.raise_for_status()
+
+                async def sse_reader(task_status: TaskStatus[str] = anyio.TASK_STATUS_IGNORED) -> None:
+                    try:
+                        async for sse in event_source.aiter_sse():
+                            match sse.event:
+                                case "endpoint":
+                                    endpoint_url = urljoin(url, sse.data)
+
+                                    url_parsed = urlparse(url)
+                                    endpoint_parsed = urlparse(endpoint_url)
+                                    if (
+                                        url_parsed.netloc != endpoint_parsed.netloc
+                                        or url_parsed.scheme != endpoint_parsed.scheme
+                                    ):
+                                        raise ValueError(
+                                            f"Endpoint origin does not match connection origin: {endpoint_url}"
+                                        )
+
+                                    task_status.started(endpoint_url)
+
+                                case "message":
+                                    try:
+                                        message = types.JSONRPCMessage.model_validate_json(sse.data)
+                                    except Exception as exc:
+                                        logger.error("error parsing server message: %s", exc)
+                                        await read_stream_writer.send(exc)
+                                        continue
+
+                                    await read_stream_writer.send(message)
+
+                                case _:
+                                    logger.warning("unknown SSE event: %s", sse.event)
+
+                    except Exception as exc:
+                        logger.error("error in sse_reader: %s", exc)
+                        await read_stream_writer.send(exc)
+                    finally:
+                        await read_stream_writer.aclose()
+
+                async def post_writer(endpoint_url: str) -> None:
+                    try:
+                        async with write_stream_reader:
+                            async for message in write_stream_reader:
+                                # serialize with pydantic, rather than dumping to a dict for httpx to
+                                # serialize again with the stdlib json module
+                                response = await http_client.post(
+                                    endpoint_url,
+                                    headers=post_headers,
+                                    content=message.__pydantic_serializer__.to_json(
+                                        message, by_alias=True, exclude_none=True
+                                    ),
+                                )
+                                response.raise_for_status()
+                    except Exception as exc:
+                        logger.error("error in post_writer: %s", exc)
+                    finally:
+                        await write_stream.aclose()
+
+                endpoint_url = await tg.start(sse_reader)
+                tg.start_soon(post_writer, endpoint_url)
+
+                try:
+                    yield read_stream, write_stream
+                finally:
+                    tg.cancel_scope.cancel()
+        finally:
+            await read_stream_writer.aclose()
+            await write_stream.aclose()
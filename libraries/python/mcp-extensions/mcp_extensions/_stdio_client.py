@@ -0,0 +1,212 @@
+"""
+Buffered stdio client transport.
+
+Adapted from mcp.client.stdio.stdio_client in mcp 1.6.0 (the version pinned in pyproject.toml), along
+with the platform helpers it uses to start and stop the server process, which are private upstream.
+"""
+
+import codecs
+import shutil
+import subprocess
+import sys
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, TextIO
+
+import anyio
+import anyio.lowlevel
+from anyio.abc import Process
+from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
+from mcp import types
+from mcp.client.stdio import StdioServerParameters, get_default_environment
+
+# size of each read from the server's stdout
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class LineBuffer:
+    """
+    Accumulates bytes and splits them into newline-delimited frames.
+
+    Only newly received bytes are scanned for a delimiter, so a large frame arriving over many reads is
+    not re-scanned (or re-copied) on every read.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        self._scanned = 0
+
+    def feed(self, data: bytes) -> list[bytes]:
+        """Add data to the buffer and return any complete frames, without their delimiters."""
+        self._buffer += data
+
+        frames: list[bytes] = []
+        start = 0
+        index = self._buffer.find(b"\n", self._scanned)
+        while index != -1:
+            frames.append(bytes(self._buffer[start:index]))
+            start = index + 1
+            index = self._buffer.find(b"\n", start)
+
+        if start:
+            del self._buffer[:start]
+        self._scanned = len(self._buffer)
+        return frames
+
+
+def _get_executable_command(command: str) -> str:
+    """Resolve the command to run, finding the executable by extension on Windows."""
+    if sys.platform != "win32":
+        return command
+
+    try:
+        if shutil.which(command) is not None:
+            return command
+
+        for ext in [".cmd", ".bat", ".exe", ".ps1"]:
+            if shutil.which(f"{command}{ext}") is not None:
+                return f"{command}{ext}"
+
+        return command
+    except OSError:
+        return command
+
+
+async def _create_process(
+    command: str, args: list[str], env: dict[str, str] | None, errlog: TextIO, cwd: str | Path | None
+) -> Process:
+    """Start the server process, without a console window on Windows."""
+    if sys.platform != "win32":
+        return await anyio.open_process([command, *args], env=env, stderr=errlog, cwd=cwd)
+
+    try:
+        return await anyio.open_process(
+            [command, *args],
+            env=env,
+            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+            stderr=errlog,
+            cwd=cwd,
+        )
+    except Exception:
+        # some environments reject the creation flags, so retry without them
+        return await anyio.open_process([command, *args], env=env, stderr=errlog, cwd=cwd)
+
+
+async def _terminate_process(process: Process) -> None:
+    """Terminate the server process, killing it on Windows if it does not exit promptly."""
+    process.terminate()
+    if sys.platform != "win32":
+        return
+
+    try:
+        with anyio.fail_after(2.0):
+            await process.wait()
+    except TimeoutError:
+        process.kill()
+
+
+@asynccontextmanager
+async def buffered_stdio_client(
+    server: StdioServerParameters, errlog: TextIO = sys.stderr
+) -> AsyncIterator[
+    tuple[
+        MemoryObjectReceiveStream[types.JSONRPCMessage | Exception],
+        MemoryObjectSendStream[types.JSONRPCMessage],
+    ]
+]:
+    """
+    Client transport for stdio, equivalent to mcp.client.stdio.stdio_client, with buffered framing.
+
+    Reads are taken from the server's stdout in chunks of up to READ_CHUNK_SIZE and split into frames as
+    soon as they arrive, never waiting for a full buffer. Writes coalesce any messages that are already
+    queued into a single write to the server's stdin, so concurrent requests share a syscall.
+    """
+
+    read_stream: MemoryObjectReceiveStream[types.JSONRPCMessage | Exception]
+    read_stream_writer: MemoryObjectSendStream[types.JSONRPCMessage | Exception]
+
+    write_stream: MemoryObjectSendStream[types.JSONRPCMessage]
+    write_stream_reader: MemoryObjectReceiveStream[types.JSONRPCMessage]
+
+    read_stream_writer, read_stream = anyio.create_memory_object_stream(0)
+    write_stream, write_stream_reader = anyio.create_memory_object_stream(0)
+
+    process = await _create_process(
+        command=_get_executable_command(server.command),
+        args=server.args,
+        env=({**get_default_environment(), **server.env} if server.env is not None else get_default_environment()),
+        errlog=errlog,
+        cwd=server.cwd,
+    )
+
+    # with utf-8 and strict error handling, frames are serialized to and parsed from bytes directly,
+    # skipping the intermediate str (and its extra copy) for each message
+    utf8_framing = codecs.lookup(server.encoding).name == "utf-8" and server.encoding_error_handler == "strict"
+
+    def encode(message: types.JSONRPCMessage) -> bytes:
+        if utf8_framing:
+            return message.__pydantic_serializer__.to_json(message, by_alias=True, exclude_none=True) + b"\n"
+
+        json = message.model_dump_json(by_alias=True, exclude_none=True)
+        return (json + "\n").encode(encoding=server.encoding, errors=server.encoding_error_handler)
+
+    def decode(frame: bytes) -> types.JSONRPCMessage:
+        if utf8_framing:
+            return types.JSONRPCMessage.model_validate_json(frame)
+
+        return types.JSONRPCMessage.model_validate_json(
+            frame.decode(encoding=server.encoding, errors=server.encoding_error_handler)
+        )
+
+    async def stdout_reader() -> None:
+        assert process.stdout, "Opened process is missing stdout"
+
+        line_buffer = LineBuffer()
+        try:
+            async with read_stream_writer:
+                while True:
+                    try:
+                        chunk = await process.stdout.receive(READ_CHUNK_SIZE)
+                    except anyio.EndOfStream:
+                        break
+
+                    for frame in line_buffer.feed(chunk):
+                        try:
+                            message = decode(frame)
+                        except Exception as exc:
+                            await read_stream_writer.send(exc)
+                            continue
+
+                        await read_stream_writer.send(message)
+        except anyio.ClosedResourceError:
+            await anyio.lowlevel.checkpoint()
+
+    async def stdin_writer() -> None:
+        assert process.stdin, "Opened process is missing stdin"
+
+        try:
+            async with write_stream_reader:
+                async for message in write_stream_reader:
+                    frames = [encode(message)]
+                    # coalesce messages that are already waiting, without waiting for more to arrive
+                    while True:
+                        try:
+                            frames.append(encode(write_stream_reader.receive_nowait()))
+                        except (anyio.WouldBlock, anyio.EndOfStream):
+                            break
+
+                    await process.stdin.send(b"".join(frames))
+        except anyio.ClosedResourceError:
+            await anyio.lowlevel.checkpoint()
+
+    async with (
+        anyio.create_task_group() as tg,
+        process,
+    ):
+        tg.start_soon(stdout_reader)
+        tg.start_soon(stdin_writer)
+        try:
+            yield read_stream, write_stream
+        finally:
+            # Clean up process to prevent any dangling orphaned processes
+            await _terminate_process(process)
@@ -0,0 +1,22 @@
+from mcp_extensions._stdio_client import LineBuffer
+
+
+def test_line_buffer_splits_frames():
+    line_buffer = LineBuffer()
+
+    assert line_buffer.feed(b'{"a": 1}\n{"b": 2}\n') == [b'{"a": 1}', b'{"b": 2}']
+
+
+def test_line_buffer_joins_partial_frames():
+    line_buffer = LineBuffer()
+
+    assert line_buffer.feed(b'{"a":') == []
+    assert line_buffer.feed(b" 1}") == []
+    assert line_buffer.feed(b'\n{"b": 2}') == [b'{"a": 1}']
+    assert line_buffer.feed(b"\n") == [b'{"b": 2}']
+
+
+def test_line_buffer_keeps_empty_frames():
+    line_buffer = LineBuffer()
+
+    assert line_buffer.feed(b"\n\n") == [b"", b""]
@@ -316,13 +316,16 @@ class AssistantServiceClientBuilder:
         self,
         base_url: str,
         api_key: str,
+        transport: httpx.AsyncBaseTransport | None = None,
     ) -> None:
         self._base_url = base_url.strip("/")
         self._api_key = api_key
+        # when set, the clients share the transport, and so its connection pool, rather than each having their own
+        self._transport = transport
 
     def _client(self, *additional_paths: str) -> httpx.AsyncClient:
         return httpx.AsyncClient(
-            transport=httpx_transport_factory(),
+            transport=self._transport or httpx_transport_factory(),
             base_url="/".join([self._base_url, *additional_paths]),
             timeout=httpx.Timeout(5.0, connect=10.0, read=60.0),
             headers={
@@ -10,11 +10,17 @@ async def main(
     emit: EmitFn,
     run: RunRoutineFn,
     ask_user: AskUserFn,
-    filename: str,
-) -> str:
+    filename: str = "",
+    filenames: list[str] | None = None,
+) -> str | dict[str, str]:
     """
-    Read the contents of a file.
+    Read the contents of a file. If filenames are given, read all of them and return their contents by filename.
     """
+    if not filename and not filenames:
+        raise ValueError("Either filename or filenames is required.")
+
     posix_skill = cast(PosixSkill, context.skills["posix"])
     shell = posix_skill.shell
-    return shell.read_file(filename)
+    if filenames:
+        return await shell.read_files_async(filenames)
+    return await shell.read_file_async(filename)
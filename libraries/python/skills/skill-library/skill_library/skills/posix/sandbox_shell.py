@@ -1,3 +1,4 @@
+import asyncio
 import os
 import shutil
 import subprocess
@@ -84,6 +85,18 @@ class SandboxShell:
         with open(filepath, "r") as f:
             return f.read()
 
+    async def read_file_async(self, filename) -> str:
+        """Read the contents of a file, without blocking the event loop."""
+        return await asyncio.to_thread(self.read_file, filename)
+
+    def read_files(self, filenames: list[str]) -> dict[str, str]:
+        """Read the contents of multiple files."""
+        return {filename: self.read_file(filename) for filename in filenames}
+
+    async def read_files_async(self, filenames: list[str]) -> dict[str, str]:
+        """Read the contents of multiple files in a single hop off the event loop."""
+        return await asyncio.to_thread(self.read_files, filenames)
+
     def write_file(self, filename, content) -> None:
         """Write content to a file."""
         filepath = self._resolve_path(filename)
@@ -0,0 +1,30 @@
+"""index conversationmessage conversation_id, sequence
+
+Revision ID: a6daeefec1e2
+Revises: 3763629295ad
+Create Date: 2026-10-15 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a6daeefec1e2"
+down_revision: Union[str, None] = "3763629295ad"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_conversationmessage_conversation_id_sequence",
+        "conversationmessage",
+        ["conversation_id", "sequence"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_conversationmessage_conversation_id_sequence", table_name="conversationmessage")
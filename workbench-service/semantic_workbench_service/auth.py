@@ -16,11 +16,19 @@ class UserPrincipal:
     user_id: str
     name: str
 
+    @property
+    def participant_id(self) -> str:
+        return self.user_id
+
 
 @dataclass
 class AssistantPrincipal(AssistantServicePrincipal):
     assistant_id: uuid.UUID
 
+    @property
+    def participant_id(self) -> str:
+        return str(self.assistant_id)
+
 
 class ServiceUserPrincipal(UserPrincipal):
     pass
@@ -1,24 +1,53 @@
 import logging
+import threading
+import time
 
+from azure.core.credentials import AccessToken
 from azure.identity import DefaultAzureCredential
 
 from . import settings
 
 logger = logging.getLogger(__name__)
 
+# cached tokens are refreshed this long before they expire, so that clients are not handed a token that is about to
+# expire
+TOKEN_REFRESH_MARGIN_SECONDS = 300
+
+_lock = threading.Lock()
+_credential: DefaultAzureCredential | None = None
+_access_token: AccessToken | None = None
+
 
 def get_token() -> dict[str, str]:
     if settings.azure_speech.resource_id == "" or settings.azure_speech.region == "":
         return {}
 
-    credential = DefaultAzureCredential()
-    try:
-        token = credential.get_token("https://cognitiveservices.azure.com/.default").token
-    except Exception as e:
-        logger.error(f"Failed to get token: {e}")
+    token = _get_access_token()
+    if token is None:
         return {}
 
     return {
         "token": f"aad#{settings.azure_speech.resource_id}#{token}",
         "region": settings.azure_speech.region,
     }
+
+
+def _get_access_token() -> str | None:
+    """
+    Returns a cached access token, only requesting a new one from Azure when it is close to expiring. The lock is
+    held while requesting, so that concurrent requests wait for the one refresh rather than each making their own.
+    """
+    global _credential, _access_token
+
+    with _lock:
+        if _access_token is None or _access_token.expires_on - TOKEN_REFRESH_MARGIN_SECONDS <= time.time():
+            if _credential is None:
+                _credential = DefaultAzureCredential()
+
+            try:
+                _access_token = _credential.get_token("https://cognitiveservices.azure.com/.default")
+            except Exception as e:
+                logger.error(f"Failed to get token: {e}")
+                return None
+
+        return _access_token.token
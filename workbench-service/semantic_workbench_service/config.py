@@ -12,6 +12,10 @@ class DBSettings(BaseSettings):
     echosql: bool = False
     postgresql_ssl_mode: str = "require"
     postgresql_pool_size: int = 10
+    postgresql_pool_max_overflow: int = 10
+    postgresql_pool_timeout_seconds: float = 30.0
+    # recycle connections before the server, or a load balancer in front of it, drops them for being idle
+    postgresql_pool_recycle_seconds: int = 1800
     alembic_config_path: str = "./alembic.ini"
 
 
@@ -45,6 +49,33 @@ class WebServiceSettings(BaseSettings):
 
     assistant_service_online_check_interval_seconds: float = 10.0
 
+    # how long to cache the assistants to notify of a conversation's events, and for how many conversations
+    notify_assistant_ids_cache_ttl_seconds: float = 2.0
+    notify_assistant_ids_cache_max_size: int = 1024
+
+    # the maximum number of events to buffer for forwarding to an assistant, after which the oldest are dropped
+    assistant_event_queue_max_size: int = 2048
+
+    # the maximum number of buffered events to forward to an assistant together
+    assistant_event_batch_max_events: int = 32
+
+    # the number of workers that run the follow-up work of created messages (such as retitling the conversation),
+    # and the maximum number of those tasks to queue for them, after which new tasks are dropped
+    message_task_workers: int = 4
+    message_task_queue_max_size: int = 1024
+
+    # the maximum number of buffered events to send to an SSE client in a single write
+    sse_batch_max_events: int = 32
+
+    # how long to wait for more events after the first of a burst, so that they are sent to an SSE client together
+    sse_coalesce_window_seconds: float = 0.01
+
+    # the maximum number of events to buffer for an SSE client, after which the oldest are dropped
+    sse_subscriber_max_events: int = 1024
+
+    # how long sending to an SSE client may block before the client is considered gone and disconnected
+    sse_send_timeout_seconds: float = 30.0
+
     azure_openai_endpoint: Annotated[str, Field(validation_alias="azure_openai_endpoint")] = ""
     azure_openai_deployment: Annotated[str, Field(validation_alias="azure_openai_deployment")] = "gpt-4o-mini"
     azure_openai_model: Annotated[str, Field(validation_alias="azure_openai_model")] = "gpt-4o-mini"
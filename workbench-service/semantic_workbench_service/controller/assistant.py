@@ -8,7 +8,7 @@ import shutil
 import tempfile
 import uuid
 import zipfile
-from typing import IO, AsyncContextManager, Awaitable, BinaryIO, Callable, NamedTuple
+from typing import IO, AsyncContextManager, BinaryIO, Callable, NamedTuple, Sequence
 
 import httpx
 from semantic_workbench_api_model.assistant_model import (
@@ -39,7 +39,7 @@ from sqlmodel import col, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from .. import auth, db, files, query, settings
-from ..event import ConversationEventQueueItem
+from ..event import ConversationEventQueueItem, NotifyEvent
 from . import convert, exceptions, export_import
 from . import participant as participant_
 from . import user as user_
@@ -58,7 +58,7 @@ class AssistantController:
     def __init__(
         self,
         get_session: Callable[[], AsyncContextManager[AsyncSession]],
-        notify_event: Callable[[ConversationEventQueueItem], Awaitable],
+        notify_event: NotifyEvent,
         client_pool: AssistantServiceClientPool,
         file_storage: files.Storage,
     ) -> None:
@@ -128,7 +128,7 @@ class AssistantController:
             from_export=from_export,
         )
 
-    async def forward_event_to_assistant(self, assistant_id: uuid.UUID, event: ConversationEvent) -> None:
+    async def forward_events_to_assistant(self, assistant_id: uuid.UUID, events: Sequence[ConversationEvent]) -> None:
         async with self._get_session() as session:
             assistant = (
                 await session.exec(
@@ -138,16 +138,18 @@ class AssistantController:
                 )
             ).one()
 
-        try:
-            await (await self._client_pool.assistant_client(assistant)).post_conversation_event(event=event)
-        except AssistantError as e:
-            if e.status_code != httpx.codes.NOT_FOUND:
-                logger.exception(
-                    "error forwarding event to assistant; assistant_id: %s, conversation_id: %s, event: %s",
-                    assistant.assistant_id,
-                    event.conversation_id,
-                    event,
-                )
+        assistant_client = await self._client_pool.assistant_client(assistant)
+        for event in events:
+            try:
+                await assistant_client.post_conversation_event(event=event)
+            except AssistantError as e:
+                if e.status_code != httpx.codes.NOT_FOUND:
+                    logger.exception(
+                        "error forwarding event to assistant; assistant_id: %s, conversation_id: %s, event: %s",
+                        assistant.assistant_id,
+                        event.conversation_id,
+                        event,
+                    )
 
     async def _remove_assistant_from_conversation(
         self,
@@ -185,7 +187,8 @@ class AssistantController:
                         ),
                         participants=participants,
                     )
-                )
+                ),
+                session=session,
             )
 
         await session.flush()
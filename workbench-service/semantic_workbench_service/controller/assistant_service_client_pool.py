@@ -1,6 +1,8 @@
 import asyncio
 from typing import Self
 
+import httpx
+from semantic_workbench_api_model import assistant_service_client
 from semantic_workbench_api_model.assistant_service_client import (
     AssistantClient,
     AssistantServiceClient,
@@ -15,9 +17,10 @@ class AssistantServiceClientPool:
         self._api_key_store = api_key_store
         self._service_clients: dict[str, AssistantServiceClient] = {}
         self._assistant_clients: dict[str, AssistantClient] = {}
+        self._transports: dict[str, httpx.AsyncBaseTransport] = {}
         self._client_lock = asyncio.Lock()
 
-    def __aenter__(self) -> Self:
+    async def __aenter__(self) -> Self:
         return self
 
     async def __aexit__(self, exc_type, exc_value, traceback) -> None:
@@ -25,6 +28,12 @@ class AssistantServiceClientPool:
             await client.aclose()
         for client in self._assistant_clients.values():
             await client.aclose()
+        for transport in self._transports.values():
+            await transport.aclose()
+
+        self._service_clients.clear()
+        self._assistant_clients.clear()
+        self._transports.clear()
 
     async def service_client(self, registration: db.AssistantServiceRegistration) -> AssistantServiceClient:
         service_id = registration.assistant_service_id
@@ -60,7 +69,16 @@ class AssistantServiceClientPool:
         if api_key is None:
             raise RuntimeError(f"assistant service {registration.assistant_service_id} does not have API key set")
 
+        # the clients for a service and all of its assistants share one transport, so that they share its pool of
+        # keep-alive connections to the service, rather than each opening connections of their own
+        base_url = str(registration.assistant_service_url)
+        transport = self._transports.get(base_url)
+        if transport is None:
+            transport = assistant_service_client.httpx_transport_factory()
+            self._transports[base_url] = transport
+
         return AssistantServiceClientBuilder(
-            base_url=str(registration.assistant_service_url),
+            base_url=base_url,
             api_key=api_key,
+            transport=transport,
         )
@@ -1,6 +1,6 @@
 import datetime
 import logging
-from typing import AsyncContextManager, Awaitable, Callable, Iterable
+from typing import AsyncContextManager, Callable, Iterable
 
 from semantic_workbench_api_model.assistant_model import ServiceInfoModel
 from semantic_workbench_api_model.assistant_service_client import AssistantError
@@ -18,7 +18,7 @@ from sqlmodel import col, or_, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from .. import assistant_api_key, auth, db, settings
-from ..event import ConversationEventQueueItem
+from ..event import ConversationEventQueueItem, NotifyEvent
 from . import convert, exceptions
 from . import participant as participant_
 from . import user as user_
@@ -31,7 +31,7 @@ class AssistantServiceRegistrationController:
     def __init__(
         self,
         get_session: Callable[[], AsyncContextManager[AsyncSession]],
-        notify_event: Callable[[ConversationEventQueueItem], Awaitable],
+        notify_event: NotifyEvent,
         api_key_store: assistant_api_key.ApiKeyStore,
         client_pool: AssistantServiceClientPool,
     ) -> None:
@@ -4,7 +4,6 @@ import uuid
 from typing import (
     Annotated,
     AsyncContextManager,
-    Awaitable,
     Callable,
     Iterable,
     Literal,
@@ -37,7 +36,7 @@ from sqlmodel import and_, col, or_, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from .. import auth, db, query, settings
-from ..event import ConversationEventQueueItem
+from ..event import ConversationEventQueueItem, NotifyEvent
 from . import assistant, convert, exceptions
 from . import participant as participant_
 from . import user as user_
@@ -68,7 +67,7 @@ class ConversationController:
     def __init__(
         self,
         get_session: Callable[[], AsyncContextManager[AsyncSession]],
-        notify_event: Callable[[ConversationEventQueueItem], Awaitable],
+        notify_event: NotifyEvent,
         assistant_controller: assistant.AssistantController,
     ) -> None:
         self._get_session = get_session
@@ -112,7 +111,7 @@ class ConversationController:
         return await self.get_conversation(
             conversation_id=conversation.conversation_id,
             principal=user_principal,
-            latest_message_types=set(),
+            latest_message_types=frozenset(),
         )
 
     async def create_conversation_with_owner(
@@ -170,7 +169,7 @@ class ConversationController:
         return await self.get_conversation(
             conversation_id=conversation.conversation_id,
             principal=principal,
-            latest_message_types=set(),
+            latest_message_types=frozenset(),
         )
 
     async def _projections_with_participants(
@@ -256,7 +255,7 @@ class ConversationController:
     async def get_conversations(
         self,
         principal: auth.ActorPrincipal,
-        latest_message_types: set[MessageType],
+        latest_message_types: frozenset[MessageType],
         include_all_owned: bool = False,
     ) -> ConversationList:
         async with self._get_session() as session:
@@ -283,7 +282,7 @@ class ConversationController:
         self,
         user_principal: auth.UserPrincipal,
         assistant_id: uuid.UUID,
-        latest_message_types: set[MessageType],
+        latest_message_types: frozenset[MessageType],
     ) -> ConversationList:
         async with self._get_session() as session:
             assistant = (
@@ -318,7 +317,7 @@ class ConversationController:
         self,
         conversation_id: uuid.UUID,
         principal: auth.ActorPrincipal,
-        latest_message_types: set[MessageType],
+        latest_message_types: frozenset[MessageType],
     ) -> Conversation:
         async with self._get_session() as session:
             include_all_owned = isinstance(principal, auth.UserPrincipal)
@@ -410,7 +409,7 @@ class ConversationController:
         conversation_model = await self.get_conversation(
             conversation_id=conversation.conversation_id,
             principal=user_principal,
-            latest_message_types=set(),
+            latest_message_types=frozenset(),
         )
 
         await self._notify_event(
@@ -756,7 +755,8 @@ class ConversationController:
                             participant=participant,
                             participants=participants,
                         ),
-                    )
+                    ),
+                    session=session,
                 )
 
             return participant
@@ -1002,7 +1002,7 @@ class ConversationController:
         conversation_model = await self.get_conversation(
             conversation_id=conversation.conversation_id,
             principal=principal,
-            latest_message_types=set(),
+            latest_message_types=frozenset(),
         )
 
         await self._notify_event(
@@ -1,6 +1,6 @@
 import logging
 import uuid
-from typing import AsyncContextManager, Awaitable, Callable
+from typing import AsyncContextManager, Callable
 
 from semantic_workbench_api_model.workbench_model import (
     ConversationShare,
@@ -13,7 +13,7 @@ from sqlmodel import and_, col, or_, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from .. import auth, db, query
-from ..event import ConversationEventQueueItem
+from ..event import NotifyEvent
 from . import convert, exceptions
 from . import user as user_
 
@@ -24,7 +24,7 @@ class ConversationShareController:
     def __init__(
         self,
         get_session: Callable[[], AsyncContextManager[AsyncSession]],
-        notify_event: Callable[[ConversationEventQueueItem], Awaitable],
+        notify_event: NotifyEvent,
     ) -> None:
         self._get_session = get_session
         self._notify_event = notify_event
@@ -241,9 +241,11 @@ def conversation_share_redemption_list_from_db(
 
 
 def conversation_message_from_db(model: db.ConversationMessage, has_debug: bool) -> ConversationMessage:
-    return ConversationMessage(
+    # messages are converted in bulk when listed, and the database rows are already valid, so the models are
+    # constructed without validation
+    return ConversationMessage.model_construct(
         id=model.message_id,
-        sender=MessageSender(
+        sender=MessageSender.model_construct(
             participant_id=model.sender_participant_id,
             participant_role=ParticipantRole(model.sender_participant_role),
         ),
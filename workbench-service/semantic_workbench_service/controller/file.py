@@ -1,8 +1,8 @@
+import asyncio
 import uuid
 from typing import (
     Any,
     AsyncContextManager,
-    Awaitable,
     Callable,
     Generator,
     Iterable,
@@ -20,7 +20,7 @@ from sqlmodel import col, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from .. import auth, db, files, query
-from ..event import ConversationEventQueueItem
+from ..event import ConversationEventQueueItem, NotifyEvent
 from . import convert, exceptions
 
 DownloadFileResult = NamedTuple(
@@ -32,7 +32,7 @@ class FileController:
     def __init__(
         self,
         get_session: Callable[[], AsyncContextManager[AsyncSession]],
-        notify_event: Callable[[ConversationEventQueueItem], Awaitable],
+        notify_event: NotifyEvent,
         file_storage: files.Storage,
     ) -> None:
         self._get_session = get_session
@@ -114,11 +114,20 @@ class FileController:
                 )
                 file_record_and_versions.append((file_record, new_version))
 
-                self._file_storage.write_file(
-                    namespace=str(conversation_id),
-                    filename=new_version.storage_filename,
-                    content=upload_file.file,
+            # the files are written concurrently, in worker threads, rather than one after another on the event loop
+            await asyncio.gather(
+                *(
+                    asyncio.to_thread(
+                        self._file_storage.write_file,
+                        namespace=str(conversation_id),
+                        filename=new_version.storage_filename,
+                        content=upload_file.file,
+                    )
+                    for (_, new_version), (_, upload_file) in zip(file_record_and_versions, file_record_and_uploads)
                 )
+            )
+
+            for file_record, new_version in file_record_and_versions:
                 session.add(file_record)
                 session.add(new_version)
 
@@ -307,7 +316,7 @@ class FileController:
                 namespace=str(conversation_id),
                 filename=version_record.storage_filename,
             ) as file:
-                for chunk in iter(lambda: file.read(100 * 1_024), b""):
+                for chunk in iter(lambda: file.read(files.READ_CHUNK_SIZE), b""):
                     yield chunk
 
         filename = file_record.filename.split("/")[-1]
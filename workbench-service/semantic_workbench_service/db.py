@@ -300,6 +300,12 @@ class ConversationMessage(SQLModel, table=True):
     # this relationship is needed to enforce correct INSERT order by SQLModel
     related_conversation: Conversation = Relationship()
 
+    __table_args__ = (
+        # messages are listed per conversation in sequence order, and paged by sequence, so this index lets those
+        # queries seek to the page rather than scanning the messages of all conversations
+        sqlalchemy.Index("ix_conversationmessage_conversation_id_sequence", "conversation_id", "sequence"),
+    )
+
 
 class ConversationMessageDebug(SQLModel, table=True):
     message_id: uuid.UUID = Field(
@@ -420,6 +426,9 @@ async def create_engine(settings: DBSettings) -> AsyncIterator[AsyncEngine]:
             },
             "pool_pre_ping": True,
             "pool_size": settings.postgresql_pool_size,
+            "max_overflow": settings.postgresql_pool_max_overflow,
+            "pool_timeout": settings.postgresql_pool_timeout_seconds,
+            "pool_recycle": settings.postgresql_pool_recycle_seconds,
         })
 
     engine = create_async_engine(db_url, **kw_args)
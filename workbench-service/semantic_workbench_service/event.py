@@ -1,9 +1,140 @@
-from typing import Literal
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Generic, Literal, MutableMapping, Protocol, Self, TypeVar
+from weakref import WeakSet
 
 from pydantic import BaseModel
 from semantic_workbench_api_model.workbench_model import ConversationEvent
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+EventT = TypeVar("EventT")
+KeyT = TypeVar("KeyT")
 
 
 class ConversationEventQueueItem(BaseModel):
     event: ConversationEvent
     event_audience: set[Literal["user", "assistant"]] = set(["user", "assistant"])
+
+
+class NotifyEvent(Protocol):
+    """
+    Notifies subscribers of a conversation event.
+
+    Callers that have a database session open can pass it, so that any queries needed to notify the event run
+    on that session's connection, rather than checking out another.
+    """
+
+    def __call__(
+        self, queue_item: ConversationEventQueueItem, session: AsyncSession | None = None
+    ) -> Awaitable[None]: ...
+
+
+@dataclass(frozen=True)
+class SerializedConversationEvent:
+    """
+    A conversation event with its server-sent event encoded to wire bytes, so that it is serialized and encoded
+    once and the same bytes are sent to all subscribers to the conversation, rather than once per subscriber.
+    """
+
+    event: ConversationEvent
+    encoded_server_sent_event: bytes
+
+    @staticmethod
+    def from_event(event: ConversationEvent) -> "SerializedConversationEvent":
+        # the data is serialized straight to bytes by pydantic, and, as compact json has no line breaks, it is
+        # written as a single data field without decoding it to a string and splitting it into lines
+        return SerializedConversationEvent(
+            event=event,
+            encoded_server_sent_event=b"id: %b\r\nevent: %b\r\ndata: %b\r\nretry: 1000\r\n\r\n"
+            % (
+                event.id.encode(),
+                event.event.value.encode(),
+                event.__pydantic_serializer__.to_json(event, include={"timestamp", "data"}),
+            ),
+        )
+
+
+class SubscriberEventBuffer(Generic[EventT]):
+    """
+    Buffers events for a single server-sent events subscriber.
+
+    Events are pushed synchronously, and the subscriber waits on an event that is set when events are pushed,
+    rather than polling a queue with a timeout. When max_events is set and the subscriber falls that far behind,
+    the oldest events are dropped, and counted in dropped_events.
+    """
+
+    def __init__(self, coalesce_seconds: float = 0.0, max_events: int | None = None) -> None:
+        self._events: deque[EventT] = deque(maxlen=max_events)
+        self._available = asyncio.Event()
+        self._coalesce_seconds = coalesce_seconds
+        self.dropped_events = 0
+
+    def push(self, event: EventT) -> None:
+        if len(self._events) == self._events.maxlen:
+            self.dropped_events += 1
+        self._events.append(event)
+        self._available.set()
+
+    def wake(self) -> None:
+        """Wake the subscriber without pushing an event, for example so that it can observe a stop signal."""
+        self._available.set()
+
+    async def wait(self) -> None:
+        """
+        Wait until there are events, or the subscriber is woken.
+
+        When waiting for new events, rather than draining a backlog, this waits a further coalesce_seconds after the
+        first event arrives, so that events that arrive in a burst can be sent together.
+        """
+        if self._events:
+            return
+
+        await self._available.wait()
+
+        if self._coalesce_seconds > 0 and self._events:
+            await asyncio.sleep(self._coalesce_seconds)
+
+    def pop(self, max_events: int) -> list[EventT]:
+        """Remove and return up to max_events of the buffered events, oldest first."""
+        events = [self._events.popleft() for _ in range(min(max_events, len(self._events)))]
+        if not self._events:
+            self._available.clear()
+        return events
+
+
+class Subscription(Generic[KeyT, EventT]):
+    """
+    Registers a buffer as a subscriber under a key when created, and unregisters it when closed, or when the
+    subscription is used as a context manager and the context exits. The key's set of subscribers is removed when
+    the last one leaves, but only if it is still the set registered under the key, so that a set that was replaced
+    meanwhile is left alone.
+    """
+
+    def __init__(
+        self,
+        subscribers: MutableMapping[KeyT, WeakSet[SubscriberEventBuffer[EventT]]],
+        key: KeyT,
+        buffer: SubscriberEventBuffer[EventT],
+    ) -> None:
+        self._subscribers = subscribers
+        self._key = key
+        self._buffer = buffer
+
+        buffers = subscribers.get(key)
+        if buffers is None:
+            buffers = WeakSet()
+            subscribers[key] = buffers
+        buffers.add(buffer)
+        self._buffers = buffers
+
+    def close(self) -> None:
+        self._buffers.discard(self._buffer)
+        if not self._buffers and self._subscribers.get(self._key) is self._buffers:
+            del self._subscribers[self._key]
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
@@ -8,6 +8,11 @@ from pydantic_settings import BaseSettings
 
 logger = logging.getLogger(__name__)
 
+# streamed file content is read in large chunks, as each read of a download is dispatched to a worker thread
+READ_CHUNK_SIZE = 1_024 * 1_024
+
+WRITE_CHUNK_SIZE = 256 * 1_024
+
 
 class StorageSettings(BaseSettings):
     root: str = ".data/files"
@@ -48,8 +53,17 @@ class Storage:
     def write_file(self, namespace: str, filename: str, content: BinaryIO) -> None:
         file_path = self._file_path(namespace, filename, mkdir=True)
         with open(file_path, "wb") as f:
-            for chunk in iter(lambda: content.read(100 * 1_024), b""):
-                f.write(chunk)
+            readinto = getattr(content, "readinto", None)
+            if readinto is None:
+                for chunk in iter(lambda: content.read(WRITE_CHUNK_SIZE), b""):
+                    f.write(chunk)
+                return
+
+            # the content is read into one buffer that is reused for each chunk, rather than allocating a new bytes
+            # object per chunk
+            buffer = memoryview(bytearray(WRITE_CHUNK_SIZE))
+            while read := readinto(buffer):
+                f.write(buffer[:read])
 
     def delete_file(self, namespace: str, filename: str) -> None:
         file_path = self._file_path(namespace, filename)
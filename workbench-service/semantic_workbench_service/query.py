@@ -103,7 +103,7 @@ def select_conversations_for(
 
 def select_conversation_projections_for(
     principal: auth.ActorPrincipal,
-    latest_message_types: set[MessageType],
+    latest_message_types: frozenset[MessageType],
     include_all_owned: bool = False,
     include_observer: bool = False,
 ) -> Select[tuple[db.Conversation, db.ConversationMessage | None, bool, str]]:
@@ -1,20 +1,27 @@
 import asyncio
 import contextlib
 import datetime
+import hashlib
+import itertools
 import json
 import logging
+import re
+import time
 import urllib.parse
 import uuid
-from collections import defaultdict
+from collections import OrderedDict
 from contextlib import asynccontextmanager
 from typing import (
     Annotated,
     Any,
     AsyncContextManager,
     AsyncIterator,
+    Awaitable,
     Callable,
     NoReturn,
+    Sequence,
 )
+from weakref import WeakSet
 
 import asgi_correlation_id
 import starlette.background
@@ -33,6 +40,7 @@ from fastapi import (
 )
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel
 from semantic_workbench_api_model.assistant_model import (
     ConfigPutRequestModel,
     ConfigResponseModel,
@@ -83,15 +91,35 @@ from semantic_workbench_api_model.workbench_model import (
 )
 from sqlmodel import col, select
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sse_starlette import EventSourceResponse, ServerSentEvent
+from sse_starlette import EventSourceResponse
 
 from semantic_workbench_service import azure_speech
 
 from . import assistant_api_key, auth, controller, db, files, middleware, settings
-from .event import ConversationEventQueueItem
+from .event import ConversationEventQueueItem, SerializedConversationEvent, SubscriberEventBuffer, Subscription
 
 logger = logging.getLogger(__name__)
 
+_chat_message_types = frozenset({MessageType.chat})
+
+
+def _latest_message_types(message_types: list[MessageType]) -> frozenset[MessageType]:
+    # nearly all requests ask for the default, chat messages only, so that set is shared rather than built per request
+    if message_types == [MessageType.chat]:
+        return _chat_message_types
+    return frozenset(message_types)
+
+
+# the characters that urllib.parse.quote leaves as they are, with its default safe characters
+_unquoted_filename_pattern = re.compile(r"[A-Za-z0-9_.~/-]*")
+
+
+def _quote_filename(filename: str) -> str:
+    # most filenames need no quoting, and are checked with a single regex match rather than quote's per-character loop
+    if _unquoted_filename_pattern.fullmatch(filename):
+        return filename
+    return urllib.parse.quote(filename)
+
 
 def init(
     app: FastAPI,
@@ -100,16 +128,27 @@ def init(
     api_key_store = assistant_api_key.get_store()
     stop_signal: asyncio.Event = asyncio.Event()
 
-    conversation_sse_queues_lock = asyncio.Lock()
-    conversation_sse_queues: dict[uuid.UUID, set[asyncio.Queue[ConversationEvent]]] = defaultdict(set)
+    # the SSE subscriber sets are only read and changed synchronously, between awaits, on the event loop, so they
+    # need no locks. subscribers register when they connect, and unregister when their event generator ends. the sets
+    # hold their buffers weakly, so that a subscriber whose generator never runs, or is dropped without being closed,
+    # does not leave its buffer behind; sets emptied that way are removed by the next notification.
+    conversation_sse_queues: dict[uuid.UUID, WeakSet[SubscriberEventBuffer[SerializedConversationEvent]]] = {}
 
-    user_sse_queues_lock = asyncio.Lock()
-    user_sse_queues: dict[str, set[asyncio.Queue[uuid.UUID]]] = defaultdict(set)
+    user_sse_queues: dict[str, WeakSet[SubscriberEventBuffer[uuid.UUID]]] = {}
 
     assistant_event_queues: dict[uuid.UUID, asyncio.Queue[ConversationEvent]] = {}
 
+    # conversation_id -> (expiry, ids of the online assistants that are active participants in the conversation)
+    notify_assistant_ids_cache: OrderedDict[uuid.UUID, tuple[float, Sequence[uuid.UUID]]] = OrderedDict()
+    notify_assistant_ids_queries: dict[uuid.UUID, asyncio.Task[Sequence[uuid.UUID]]] = {}
+
     background_tasks: set[asyncio.Task] = set()
 
+    # follow-up work of created messages, run by a fixed set of workers rather than in the request's lifecycle
+    message_task_queue: asyncio.Queue[tuple[Callable[..., Awaitable[Any]], tuple[Any, ...]]] = asyncio.Queue(
+        maxsize=settings.service.message_task_queue_max_size
+    )
+
     def _controller_get_session() -> AsyncContextManager[AsyncSession]:
         return db.create_session(app.state.db_engine)
 
@@ -118,30 +157,103 @@ def init(
     ) -> NoReturn:
         while True:
             try:
-                event = await event_queue.get()
+                events = [await event_queue.get()]
                 event_queue.task_done()
 
-                asgi_correlation_id.correlation_id.set(event.correlation_id)
+                # events that arrived while the previous ones were being forwarded are forwarded together
+                while not event_queue.empty() and len(events) < settings.service.assistant_event_batch_max_events:
+                    events.append(event_queue.get_nowait())
+                    event_queue.task_done()
 
-                start_time = datetime.datetime.now(datetime.UTC)
+                asgi_correlation_id.correlation_id.set(events[0].correlation_id)
 
-                await assistant_controller.forward_event_to_assistant(assistant_id=assistant_id, event=event)
+                start_time = time.monotonic()
 
-                end_time = datetime.datetime.now(datetime.UTC)
-                logger.debug(
-                    "forwarded event to assistant; assistant_id: %s, conversation_id: %s, event_id: %s,"
-                    " duration: %s, time since event: %s",
-                    assistant_id,
-                    event.conversation_id,
-                    event.id,
-                    end_time - start_time,
-                    end_time - event.timestamp,
-                )
+                await assistant_controller.forward_events_to_assistant(assistant_id=assistant_id, events=events)
+
+                # the timings are only computed when they will be logged
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        "forwarded events to assistant; assistant_id: %s, count: %d, first event_id: %s,"
+                        " duration: %s, time since first event: %s",
+                        assistant_id,
+                        len(events),
+                        events[0].id,
+                        datetime.timedelta(seconds=time.monotonic() - start_time),
+                        datetime.datetime.now(datetime.UTC) - events[0].timestamp,
+                    )
 
             except Exception:
                 logger.exception("exception in _forward_events_to_assistant")
 
-    async def _notify_event(queue_item: ConversationEventQueueItem) -> None:
+    async def _run_message_tasks() -> NoReturn:
+        while True:
+            func, args = await message_task_queue.get()
+            try:
+                await func(*args)
+            except Exception:
+                logger.exception("exception in _run_message_tasks; task: %s", func.__qualname__)
+            finally:
+                message_task_queue.task_done()
+
+    async def _query_notify_assistant_ids(
+        conversation_id: uuid.UUID, session: AsyncSession | None = None
+    ) -> Sequence[uuid.UUID]:
+        if session is None:
+            async with _controller_get_session() as session:
+                return await _query_notify_assistant_ids(conversation_id, session)
+
+        return (
+            await session.exec(
+                select(db.Assistant.assistant_id)
+                .join(
+                    db.AssistantParticipant,
+                    col(db.Assistant.assistant_id) == col(db.AssistantParticipant.assistant_id),
+                )
+                .join(db.AssistantServiceRegistration)
+                .where(col(db.AssistantServiceRegistration.assistant_service_online).is_(True))
+                .where(col(db.AssistantParticipant.active_participant).is_(True))
+                .where(db.AssistantParticipant.conversation_id == conversation_id)
+            )
+        ).all()
+
+    def _cache_notify_assistant_ids(conversation_id: uuid.UUID, query_task: asyncio.Task[Sequence[uuid.UUID]]) -> None:
+        if notify_assistant_ids_queries.get(conversation_id) is not query_task:
+            # invalidated while the query was in flight
+            return
+
+        del notify_assistant_ids_queries[conversation_id]
+        if query_task.cancelled() or query_task.exception() is not None:
+            return
+
+        notify_assistant_ids_cache[conversation_id] = (
+            time.monotonic() + settings.service.notify_assistant_ids_cache_ttl_seconds,
+            query_task.result(),
+        )
+        notify_assistant_ids_cache.move_to_end(conversation_id)
+        while len(notify_assistant_ids_cache) > settings.service.notify_assistant_ids_cache_max_size:
+            notify_assistant_ids_cache.popitem(last=False)
+
+    async def _get_notify_assistant_ids(conversation_id: uuid.UUID) -> Sequence[uuid.UUID]:
+        cached = notify_assistant_ids_cache.get(conversation_id)
+        if cached is not None and cached[0] > time.monotonic():
+            notify_assistant_ids_cache.move_to_end(conversation_id)
+            return cached[1]
+
+        # concurrent misses for the same conversation share a single query
+        query_task = notify_assistant_ids_queries.get(conversation_id)
+        if query_task is None:
+            query_task = asyncio.create_task(_query_notify_assistant_ids(conversation_id))
+            notify_assistant_ids_queries[conversation_id] = query_task
+            query_task.add_done_callback(lambda task: _cache_notify_assistant_ids(conversation_id, task))
+
+        return await asyncio.shield(query_task)
+
+    def _invalidate_notify_assistant_ids(conversation_id: uuid.UUID) -> None:
+        notify_assistant_ids_cache.pop(conversation_id, None)
+        notify_assistant_ids_queries.pop(conversation_id, None)
+
+    async def _notify_event(queue_item: ConversationEventQueueItem, session: AsyncSession | None = None) -> None:
         if stop_signal.is_set():
             logger.warning(
                 "ignoring event due to stop signal; conversation_id: %s, event: %s, id: %s",
@@ -159,18 +271,32 @@ def init(
             queue_item.event_audience,
         )
 
+        # participant changes, including assistant services going online or offline, change which assistants
+        # are notified of the conversation's events
+        participant_changed = queue_item.event.event in (
+            ConversationEventType.participant_created,
+            ConversationEventType.participant_updated,
+        )
+        if participant_changed:
+            _invalidate_notify_assistant_ids(queue_item.event.conversation_id)
+
         if "user" in queue_item.event_audience:
-            async with conversation_sse_queues_lock:
-                for queue in conversation_sse_queues.get(queue_item.event.conversation_id, {}):
-                    await queue.put(queue_item.event)
-            logger.debug(
-                "enqueued event for SSE; conversation_id: %s, event: %s, event_id: %s",
-                queue_item.event.conversation_id,
-                queue_item.event.event,
-                queue_item.event.id,
-            )
+            # the event is only serialized when a client is subscribed to the conversation
+            conversation_queues = conversation_sse_queues.get(queue_item.event.conversation_id)
+            if conversation_queues is not None and not conversation_queues:
+                del conversation_sse_queues[queue_item.event.conversation_id]
+            elif conversation_queues:
+                serialized_event = SerializedConversationEvent.from_event(queue_item.event)
+                for queue in conversation_queues:
+                    queue.push(serialized_event)
+                logger.debug(
+                    "enqueued event for SSE; conversation_id: %s, event: %s, event_id: %s",
+                    queue_item.event.conversation_id,
+                    queue_item.event.event,
+                    queue_item.event.id,
+                )
 
-            if queue_item.event.event in [
+            if user_sse_queues and queue_item.event.event in [
                 ConversationEventType.message_created,
                 ConversationEventType.message_deleted,
                 ConversationEventType.conversation_updated,
@@ -184,32 +310,38 @@ def init(
                 task.add_done_callback(background_tasks.discard)
 
         if "assistant" in queue_item.event_audience:
-            async with _controller_get_session() as session:
-                assistant_ids = (
-                    await session.exec(
-                        select(db.Assistant.assistant_id)
-                        .join(
-                            db.AssistantParticipant,
-                            col(db.Assistant.assistant_id) == col(db.AssistantParticipant.assistant_id),
-                        )
-                        .join(db.AssistantServiceRegistration)
-                        .where(col(db.AssistantServiceRegistration.assistant_service_online).is_(True))
-                        .where(col(db.AssistantParticipant.active_participant).is_(True))
-                        .where(db.AssistantParticipant.conversation_id == queue_item.event.conversation_id)
-                    )
-                ).all()
+            if participant_changed:
+                # not cached, as a participant event can be notified before its change is committed; when the
+                # caller passes its session, the query runs on its connection and sees its uncommitted change
+                assistant_ids = await _query_notify_assistant_ids(queue_item.event.conversation_id, session)
+            else:
+                assistant_ids = await _get_notify_assistant_ids(queue_item.event.conversation_id)
 
             for assistant_id in assistant_ids:
-                if assistant_id not in assistant_event_queues:
-                    queue = asyncio.Queue()
-                    assistant_event_queues[assistant_id] = queue
+                assistant_event_queue = assistant_event_queues.get(assistant_id)
+                if assistant_event_queue is None:
+                    assistant_event_queue = asyncio.Queue(maxsize=settings.service.assistant_event_queue_max_size)
+                    assistant_event_queues[assistant_id] = assistant_event_queue
                     task = asyncio.create_task(
-                        _forward_events_to_assistant(assistant_id, queue),
+                        _forward_events_to_assistant(assistant_id, assistant_event_queue),
                         name=f"forward_events_to_{assistant_id}",
                     )
                     background_tasks.add(task)
 
-                await assistant_event_queues[assistant_id].put(queue_item.event)
+                if assistant_event_queue.full():
+                    # the assistant is not keeping up (or is unreachable); drop its oldest event, rather than
+                    # buffering without bound or blocking notifications for everyone else
+                    dropped_event = assistant_event_queue.get_nowait()
+                    assistant_event_queue.task_done()
+                    logger.warning(
+                        "dropped event for assistant; assistant_id: %s, conversation_id: %s, event: %s, event_id: %s",
+                        assistant_id,
+                        dropped_event.conversation_id,
+                        dropped_event.event,
+                        dropped_event.id,
+                    )
+
+                assistant_event_queue.put_nowait(queue_item.event)
                 logger.debug(
                     "enqueued event for assistant; conversation_id: %s, event: %s, event_id: %s, assistant_id: %s",
                     queue_item.event.conversation_id,
@@ -219,28 +351,30 @@ def init(
                 )
 
     async def _notify_user_event(conversation_id: uuid.UUID) -> None:
-        listening_user_ids = set(user_sse_queues.keys())
+        if not user_sse_queues:
+            return
+
+        # query the conversation's participants and intersect them with the listening users here, rather than
+        # sending every listening user id to the database in an IN clause
         async with _controller_get_session() as session:
             active_user_participants = (
                 await session.exec(
                     select(db.UserParticipant.user_id).where(
                         col(db.UserParticipant.active_participant).is_(True),
                         db.UserParticipant.conversation_id == conversation_id,
-                        col(db.UserParticipant.user_id).in_(listening_user_ids),
                     )
                 )
             ).all()
 
-        if not active_user_participants:
-            return
+        for user_id in user_sse_queues.keys() & set(active_user_participants):
+            user_queues = user_sse_queues[user_id]
+            if not user_queues:
+                del user_sse_queues[user_id]
+                continue
 
-        async with user_sse_queues_lock:
-            for user_id in active_user_participants:
-                for queue in user_sse_queues.get(user_id, {}):
-                    await queue.put(conversation_id)
-                    logger.debug(
-                        "enqueued event for user SSE; user_id: %s, conversation_id: %s", user_id, conversation_id
-                    )
+            for queue in user_queues:
+                queue.push(conversation_id)
+                logger.debug("enqueued event for user SSE; user_id: %s, conversation_id: %s", user_id, conversation_id)
 
     assistant_client_pool = controller.AssistantServiceClientPool(api_key_store=api_key_store)
 
@@ -292,7 +426,7 @@ def init(
 
     @asynccontextmanager
     async def _lifespan() -> AsyncIterator[None]:
-        async with db.create_engine(settings.db) as engine:
+        async with db.create_engine(settings.db) as engine, assistant_client_pool:
             await db.bootstrap_db(engine, settings=settings.db)
 
             app.state.db_engine = engine
@@ -302,6 +436,8 @@ def init(
                     _update_assistant_service_online_status(), name="update_assistant_service_online_status"
                 ),
             )
+            for worker in range(settings.service.message_task_workers):
+                background_tasks.add(asyncio.create_task(_run_message_tasks(), name=f"run_message_tasks_{worker}"))
 
             try:
                 yield
@@ -309,6 +445,11 @@ def init(
             finally:
                 stop_signal.set()
 
+                # wake the SSE subscribers so that they observe the stop signal
+                for queues in (*conversation_sse_queues.values(), *user_sse_queues.values()):
+                    for queue in queues:
+                        queue.wake()
+
                 for task in background_tasks:
                     task.cancel()
 
@@ -403,7 +544,7 @@ def init(
         user_ids: Annotated[list[str], Query(alias="user_id")] = [],
         assistant_service_online: Annotated[bool | None, Query(alias="assistant_service_online")] = None,
     ) -> AssistantServiceRegistrationList:
-        user_id_set = set([user_principal.user_id if user_id == "me" else user_id for user_id in user_ids])
+        user_id_set = {user_principal.user_id if user_id == "me" else user_id for user_id in user_ids}
         return await assistant_service_registration_controller.get_registrations(
             user_ids=user_id_set, assistant_service_online=assistant_service_online
         )
@@ -442,7 +583,7 @@ def init(
         user_principal: auth.DependsUserPrincipal,
         user_ids: Annotated[list[str], Query(alias="user_id")] = [],
     ) -> AssistantServiceInfoList:
-        user_id_set = set([user_principal.user_id if user_id == "me" else user_id for user_id in user_ids])
+        user_id_set = {user_principal.user_id if user_id == "me" else user_id for user_id in user_ids}
         return await assistant_service_registration_controller.get_service_infos(user_ids=user_id_set)
 
     @app.get("/assistants")
@@ -613,18 +754,18 @@ def init(
         return await conversation_controller.get_assistant_conversations(
             user_principal=user_principal,
             assistant_id=assistant_id,
-            latest_message_types=set(latest_message_types),
+            latest_message_types=_latest_message_types(latest_message_types),
         )
 
     @app.get("/conversations/{conversation_id}/events")
     async def conversation_server_sent_events(
-        conversation_id: uuid.UUID, request: Request, principal: auth.DependsActorPrincipal
+        conversation_id: uuid.UUID, principal: auth.DependsActorPrincipal
     ) -> EventSourceResponse:
         # ensure the principal has access to the conversation
         await conversation_controller.get_conversation(
             conversation_id=conversation_id,
             principal=principal,
-            latest_message_types=set(),
+            latest_message_types=frozenset(),
         )
 
         principal_id_type = "assistant_id" if isinstance(principal, auth.AssistantPrincipal) else "user_id"
@@ -636,126 +777,134 @@ def init(
             principal_id,
             conversation_id,
         )
-        event_queue = asyncio.Queue[ConversationEvent]()
-
-        async with conversation_sse_queues_lock:
-            queues = conversation_sse_queues[conversation_id]
-            queues.add(event_queue)
+        event_queue = SubscriberEventBuffer[SerializedConversationEvent](
+            coalesce_seconds=settings.service.sse_coalesce_window_seconds,
+            max_events=settings.service.sse_subscriber_max_events,
+        )
+        # the subscriber is registered before the response starts, so that it receives every event notified after
+        # the client sees the stream open
+        subscription = Subscription(conversation_sse_queues, conversation_id, event_queue)
 
-        async def event_generator() -> AsyncIterator[ServerSentEvent]:
-            try:
+        async def event_generator() -> AsyncIterator[bytes]:
+            dropped_events = 0
+            with subscription:
                 while True:
                     if stop_signal.is_set():
                         logger.debug("sse stopping due to signal; conversation_id: %s", conversation_id)
                         break
 
-                    try:
-                        if await request.is_disconnected():
-                            logger.debug("client disconnected from sse; conversation_id: %s", conversation_id)
-                            break
-                    except Exception:
-                        logger.exception(
-                            "error checking if client disconnected from sse; conversation_id: %s", conversation_id
-                        )
-                        break
+                    # client disconnects are detected by EventSourceResponse, which listens for them and cancels
+                    # this generator, so they are not polled for here
+                    await event_queue.wait()
 
-                    try:
-                        try:
-                            async with asyncio.timeout(1):
-                                conversation_event = await event_queue.get()
-                        except asyncio.TimeoutError:
-                            continue
-
-                        server_sent_event = ServerSentEvent(
-                            id=conversation_event.id,
-                            event=conversation_event.event.value,
-                            data=conversation_event.model_dump_json(include={"timestamp", "data"}),
-                            retry=1000,
-                        )
-                        yield server_sent_event
-                        logger.debug(
-                            "sent event to sse client; %s: %s, conversation_id: %s, event: %s, id: %s, time since"
-                            " event: %s",
+                    serialized_events = event_queue.pop(settings.service.sse_batch_max_events)
+                    if not serialized_events:
+                        # woken without events, to observe the stop signal
+                        continue
+
+                    if event_queue.dropped_events > dropped_events:
+                        logger.warning(
+                            "dropped events for slow sse client; %s: %s, conversation_id: %s, count: %d",
                             principal_id_type,
                             principal_id,
                             conversation_id,
-                            conversation_event.event,
-                            conversation_event.id,
-                            datetime.datetime.now(datetime.UTC) - conversation_event.timestamp,
+                            event_queue.dropped_events - dropped_events,
                         )
+                        dropped_events = event_queue.dropped_events
+
+                    try:
+                        if len(serialized_events) == 1:
+                            yield serialized_events[0].encoded_server_sent_event
+                        else:
+                            # events that arrived in a burst are sent to the client in a single write
+                            yield b"".join(
+                                serialized_event.encoded_server_sent_event for serialized_event in serialized_events
+                            )
+
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug(
+                                "sent events to sse client; %s: %s, conversation_id: %s, count: %d, first event: %s,"
+                                " first id: %s, time since first event: %s",
+                                principal_id_type,
+                                principal_id,
+                                conversation_id,
+                                len(serialized_events),
+                                serialized_events[0].event.event,
+                                serialized_events[0].event.id,
+                                datetime.datetime.now(datetime.UTC) - serialized_events[0].event.timestamp,
+                            )
 
                     except Exception:
                         logger.exception("error sending event to sse client; conversation_id: %s", conversation_id)
 
-            finally:
-                queues.discard(event_queue)
-                if len(queues) == 0:
-                    async with conversation_sse_queues_lock:
-                        if len(queues) == 0:
-                            conversation_sse_queues.pop(conversation_id, None)
-
-        return EventSourceResponse(event_generator(), sep="\n")
+        # a client that stops reading (for example, over a dead connection) is disconnected when a send to it blocks
+        # for longer than the send timeout
+        return EventSourceResponse(event_generator(), sep="\n", send_timeout=settings.service.sse_send_timeout_seconds)
 
     @app.get("/events")
-    async def user_server_sent_events(
-        request: Request, user_principal: auth.DependsUserPrincipal
-    ) -> EventSourceResponse:
+    async def user_server_sent_events(user_principal: auth.DependsUserPrincipal) -> EventSourceResponse:
         logger.debug("client connected to user events sse; user_id: %s", user_principal.user_id)
 
-        event_queue = asyncio.Queue[uuid.UUID]()
+        event_queue = SubscriberEventBuffer[uuid.UUID](
+            coalesce_seconds=settings.service.sse_coalesce_window_seconds,
+            max_events=settings.service.sse_subscriber_max_events,
+        )
+        subscription = Subscription(user_sse_queues, user_principal.user_id, event_queue)
+
+        # event ids only need to be unique within the stream, so a counter is used rather than a random uuid
+        event_ids = itertools.count()
 
-        async with user_sse_queues_lock:
-            queues = user_sse_queues[user_principal.user_id]
-            queues.add(event_queue)
+        def encode_server_sent_event(conversation_id: uuid.UUID) -> bytes:
+            # the event's fields are fixed, so its wire format is written directly, rather than building a
+            # ServerSentEvent with json encoded data for every event
+            return b'id: %d\r\nevent: message.created\r\ndata: {"conversation_id": "%b"}\r\nretry: 1000\r\n\r\n' % (
+                next(event_ids),
+                str(conversation_id).encode(),
+            )
 
-        async def event_generator() -> AsyncIterator[ServerSentEvent]:
-            try:
+        async def event_generator() -> AsyncIterator[bytes]:
+            dropped_events = 0
+            with subscription:
                 while True:
                     if stop_signal.is_set():
                         logger.debug("sse stopping due to signal; user_id: %s", user_principal.user_id)
                         break
 
-                    try:
-                        if await request.is_disconnected():
-                            logger.debug("client disconnected from sse; user_id: %s", user_principal.user_id)
-                            break
-                    except Exception:
-                        logger.exception(
-                            "error checking if client disconnected from sse; user_id: %s", user_principal.user_id
+                    # client disconnects are detected by EventSourceResponse, which listens for them and cancels
+                    # this generator, so they are not polled for here
+                    await event_queue.wait()
+
+                    conversation_ids = event_queue.pop(settings.service.sse_batch_max_events)
+                    if not conversation_ids:
+                        # woken without events, to observe the stop signal
+                        continue
+
+                    if event_queue.dropped_events > dropped_events:
+                        logger.warning(
+                            "dropped events for slow user sse client; user_id: %s, count: %d",
+                            user_principal.user_id,
+                            event_queue.dropped_events - dropped_events,
                         )
-                        break
+                        dropped_events = event_queue.dropped_events
 
                     try:
-                        try:
-                            async with asyncio.timeout(1):
-                                conversation_id = await event_queue.get()
-                        except asyncio.TimeoutError:
-                            continue
-
-                        server_sent_event = ServerSentEvent(
-                            id=uuid.uuid4().hex,
-                            event="message.created",
-                            data=json.dumps({"conversation_id": str(conversation_id)}),
-                            retry=1000,
+                        # events that arrived in a burst are sent to the client in a single write
+                        yield b"".join(
+                            encode_server_sent_event(conversation_id) for conversation_id in conversation_ids
                         )
-                        yield server_sent_event
+
                         logger.debug(
-                            "sent event to user sse client; user_id: %s, event: %s",
+                            "sent events to user sse client; user_id: %s, event: message.created, count: %d",
                             user_principal.user_id,
-                            server_sent_event.event,
+                            len(conversation_ids),
                         )
 
                     except Exception:
                         logger.exception("error sending event to sse client; user_id: %s", user_principal.user_id)
 
-            finally:
-                queues.discard(event_queue)
-                if len(queues) == 0:
-                    async with conversation_sse_queues_lock:
-                        if len(queues) == 0:
-                            user_sse_queues.pop(user_principal.user_id, None)
-
-        return EventSourceResponse(event_generator(), sep="\n")
+        # a client that stops reading (for example, over a dead connection) is disconnected when a send to it blocks
+        # for longer than the send timeout
+        return EventSourceResponse(event_generator(), sep="\n", send_timeout=settings.service.sse_send_timeout_seconds)
 
     @app.post("/conversations")
     async def create_conversation(
@@ -789,29 +938,60 @@ def init(
             principal=principal, conversation_id=conversation_id, new_conversation=new_conversation
         )
 
-    @app.get("/conversations")
+    def _serialize_response_model(model: BaseModel) -> bytes:
+        return model.__pydantic_serializer__.to_json(model, by_alias=True)
+
+    def _json_response(model: BaseModel) -> Response:
+        """
+        Responds with the model serialized directly to JSON. When a handler returns a model, FastAPI dumps it to a
+        dict, validates that against the response model, and then serializes it, which is costly for large lists.
+        Handlers that return this response declare the response_model on the route, for the OpenAPI schema.
+        """
+        return Response(content=_serialize_response_model(model), media_type="application/json")
+
+    def _etag_response(request: Request, model: BaseModel) -> Response:
+        """
+        Responds with the model, tagged with a hash of its content, so that clients that poll for it can revalidate
+        with If-None-Match and get an empty 304 response when it has not changed.
+        """
+        content = _serialize_response_model(model)
+        etag = f'"{hashlib.blake2b(content, digest_size=16).hexdigest()}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            candidate_etags = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+            if etag in candidate_etags or "*" in candidate_etags:
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        return Response(content=content, media_type="application/json", headers=headers)
+
+    @app.get("/conversations", response_model=ConversationList)
     async def list_conversations(
         principal: auth.DependsActorPrincipal,
         include_inactive: bool = False,
         latest_message_types: Annotated[list[MessageType], Query(alias="latest_message_type")] = [MessageType.chat],
-    ) -> ConversationList:
-        return await conversation_controller.get_conversations(
+    ) -> Response:
+        conversations = await conversation_controller.get_conversations(
             principal=principal,
             include_all_owned=include_inactive,
-            latest_message_types=set(latest_message_types),
+            latest_message_types=_latest_message_types(latest_message_types),
         )
+        return _json_response(conversations)
 
-    @app.get("/conversations/{conversation_id}")
+    @app.get("/conversations/{conversation_id}", response_model=Conversation)
     async def get_conversation(
+        request: Request,
         conversation_id: uuid.UUID,
         principal: auth.DependsActorPrincipal,
         latest_message_types: Annotated[list[MessageType], Query(alias="latest_message_type")] = [MessageType.chat],
-    ) -> Conversation:
-        return await conversation_controller.get_conversation(
+    ) -> Response:
+        conversation = await conversation_controller.get_conversation(
             principal=principal,
             conversation_id=conversation_id,
-            latest_message_types=set(latest_message_types),
+            latest_message_types=_latest_message_types(latest_message_types),
         )
+        return _etag_response(request, conversation)
 
     @app.patch("/conversations/{conversation_id}")
     async def update_conversation(
@@ -825,27 +1005,25 @@ def init(
             update_conversation=update_conversation,
         )
 
-    @app.get("/conversations/{conversation_id}/participants")
+    @app.get("/conversations/{conversation_id}/participants", response_model=ConversationParticipantList)
     async def list_conversation_participants(
+        request: Request,
         conversation_id: uuid.UUID,
         principal: auth.DependsActorPrincipal,
         include_inactive: bool = False,
-    ) -> ConversationParticipantList:
-        return await conversation_controller.get_conversation_participants(
+    ) -> Response:
+        participants = await conversation_controller.get_conversation_participants(
             principal=principal,
             conversation_id=conversation_id,
             include_inactive=include_inactive,
         )
+        return _etag_response(request, participants)
 
     def _translate_participant_id_me(principal: auth.ActorPrincipal, participant_id: str) -> str:
         if participant_id != "me":
             return participant_id
 
-        match principal:
-            case auth.UserPrincipal():
-                return principal.user_id
-            case auth.AssistantPrincipal():
-                return str(principal.assistant_id)
+        return principal.participant_id
 
     @app.get("/conversations/{conversation_id}/participants/{participant_id}")
     async def get_conversation_participant(
@@ -878,7 +1056,7 @@ def init(
             principal=principal,
         )
 
-    @app.get("/conversations/{conversation_id}/messages")
+    @app.get("/conversations/{conversation_id}/messages", response_model=ConversationMessageList)
     async def list_conversation_messages(
         conversation_id: uuid.UUID,
         principal: auth.DependsActorPrincipal,
@@ -888,8 +1066,8 @@ def init(
         before: Annotated[uuid.UUID | None, Query()] = None,
         after: Annotated[uuid.UUID | None, Query()] = None,
         limit: Annotated[int, Query(lte=500)] = 100,
-    ) -> ConversationMessageList:
-        return await conversation_controller.get_messages(
+    ) -> Response:
+        messages = await conversation_controller.get_messages(
             conversation_id=conversation_id,
             principal=principal,
             participant_ids=participant_ids,
@@ -899,13 +1077,13 @@ def init(
             after=after,
             limit=limit,
         )
+        return _json_response(messages)
 
     @app.post("/conversations/{conversation_id}/messages")
     async def create_conversation_message(
         conversation_id: uuid.UUID,
         new_message: NewConversationMessage,
         principal: auth.DependsActorPrincipal,
-        background_tasks: BackgroundTasks,
     ) -> ConversationMessage:
         response, task_args = await conversation_controller.create_conversation_message(
             conversation_id=conversation_id,
@@ -913,7 +1091,15 @@ def init(
             principal=principal,
         )
         if task_args:
-            background_tasks.add_task(*task_args)
+            func, *args = task_args
+            try:
+                message_task_queue.put_nowait((func, tuple(args)))
+            except asyncio.QueueFull:
+                logger.warning(
+                    "message task queue is full; dropping task: %s, conversation_id: %s",
+                    func.__qualname__,
+                    conversation_id,
+                )
         return response
 
     @app.get(
@@ -966,10 +1152,13 @@ def init(
         principal: auth.DependsActorPrincipal,
         file_metadata_raw: str = Form(alias="metadata", default="{}"),
     ) -> FileList:
-        try:
-            file_metadata: dict[str, dict[str, Any]] = json.loads(file_metadata_raw)
-        except json.JSONDecodeError as e:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+        file_metadata: dict[str, dict[str, Any]] = {}
+        # most uploads carry no metadata, and send the default, so it is not parsed
+        if file_metadata_raw and file_metadata_raw != "{}":
+            try:
+                file_metadata = json.loads(file_metadata_raw)
+            except json.JSONDecodeError as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
 
         if not isinstance(file_metadata, dict):
             raise HTTPException(
@@ -983,24 +1172,30 @@ def init(
             file_metadata=file_metadata,
         )
 
-    @app.get("/conversations/{conversation_id}/files")
+    @app.get("/conversations/{conversation_id}/files", response_model=FileList)
     async def list_files(
+        request: Request,
         conversation_id: uuid.UUID,
         principal: auth.DependsActorPrincipal,
         prefix: str | None = None,
-    ) -> FileList:
-        return await file_controller.list_files(conversation_id=conversation_id, principal=principal, prefix=prefix)
+    ) -> Response:
+        file_list = await file_controller.list_files(
+            conversation_id=conversation_id, principal=principal, prefix=prefix
+        )
+        return _etag_response(request, file_list)
 
-    @app.get("/conversations/{conversation_id}/files/{filename:path}/versions")
+    @app.get("/conversations/{conversation_id}/files/{filename:path}/versions", response_model=FileVersions)
     async def file_versions(
+        request: Request,
         conversation_id: uuid.UUID,
         filename: str,
         principal: auth.DependsActorPrincipal,
         version: int | None = None,
-    ) -> FileVersions:
-        return await file_controller.file_versions(
+    ) -> Response:
+        versions = await file_controller.file_versions(
             conversation_id=conversation_id, filename=filename, principal=principal, version=version
         )
+        return _etag_response(request, versions)
 
     @app.get("/conversations/{conversation_id}/files/{filename:path}")
     async def download_file(
@@ -1019,7 +1214,7 @@ def init(
         return StreamingResponse(
             result.stream,
             media_type=result.content_type,
-            headers={"Content-Disposition": f'attachment; filename="{urllib.parse.quote(result.filename)}"'},
+            headers={"Content-Disposition": f'attachment; filename="{_quote_filename(result.filename)}"'},
         )
 
     @app.patch("/conversations/{conversation_id}/files/{filename:path}")
@@ -1081,15 +1276,17 @@ def init(
             include_unredeemable=include_unredeemable,
         )
 
-    @app.get("/conversation-shares/{conversation_share_id}")
+    @app.get("/conversation-shares/{conversation_share_id}", response_model=ConversationShare)
     async def get_conversation_share(
+        request: Request,
         user_principal: auth.DependsUserPrincipal,
         conversation_share_id: uuid.UUID,
-    ) -> ConversationShare:
-        return await conversation_share_controller.get_conversation_share(
+    ) -> Response:
+        conversation_share = await conversation_share_controller.get_conversation_share(
             user_principal=user_principal,
             conversation_share_id=conversation_share_id,
         )
+        return _etag_response(request, conversation_share)
 
     @app.delete("/conversation-shares/{conversation_share_id}", status_code=status.HTTP_204_NO_CONTENT)
     async def delete_conversation_share(
@@ -1129,6 +1326,7 @@ def init(
             user_principal=user_principal,
         )
 
+    # not async, as getting the token makes blocking calls to Azure, so FastAPI runs it in the threadpool
     @app.get("/azure-speech/token")
-    async def get_azure_speech_token() -> dict[str, str]:
+    def get_azure_speech_token() -> dict[str, str]:
         return azure_speech.get_token()
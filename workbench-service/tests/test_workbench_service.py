@@ -241,6 +241,31 @@ def test_create_update_conversation(workbench_service: FastAPI, test_user: MockU
         assert exclude_system_keys(get_conversation_response.metadata) == updated_metadata
 
 
+def test_get_conversation_if_none_match(workbench_service: FastAPI, test_user: MockUser):
+    with TestClient(app=workbench_service, headers=test_user.authorization_headers) as client:
+        new_conversation = workbench_model.NewConversation(title="test-conversation")
+        http_response = client.post("/conversations", json=new_conversation.model_dump(mode="json"))
+        assert httpx.codes.is_success(http_response.status_code)
+
+        conversation_id = http_response.json()["id"]
+
+        http_response = client.get(f"/conversations/{conversation_id}")
+        assert httpx.codes.is_success(http_response.status_code)
+        etag = http_response.headers["etag"]
+
+        http_response = client.get(f"/conversations/{conversation_id}", headers={"If-None-Match": etag})
+        assert http_response.status_code == httpx.codes.NOT_MODIFIED
+        assert http_response.content == b""
+
+        http_response = client.patch(f"/conversations/{conversation_id}", json={"title": "new-title"})
+        assert httpx.codes.is_success(http_response.status_code)
+
+        http_response = client.get(f"/conversations/{conversation_id}", headers={"If-None-Match": etag})
+        assert http_response.status_code == httpx.codes.OK
+        assert http_response.headers["etag"] != etag
+        assert http_response.json()["title"] == "new-title"
+
+
 def test_create_assistant_add_to_conversation(
     workbench_service: FastAPI,
     httpx_mock: HTTPXMock,